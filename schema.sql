@@ -28,6 +28,9 @@ create table Episode
 create index creator
     on Episode (user_id);
 
+create index if not exists engine
+    on Episode (game_engine);
+
 create table EpisodeVersion
 (
     episode_id      integer                           not null
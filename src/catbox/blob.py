@@ -43,9 +43,14 @@ class Blob:
         return f"/blob/{self.blob_id}"
 
     def json(self) -> JSONDict:
-        base = dataclasses.asdict(self)
-        base["url"] = self.url
-        return base
+        # Written out rather than using dataclasses.asdict, which deep-copies.
+        return {
+            "blob_id": self.blob_id,
+            "mimetype": self.mimetype,
+            "width": self.width,
+            "height": self.height,
+            "url": self.url,
+        }
 
 
 class BlobManager:
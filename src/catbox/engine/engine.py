@@ -4,7 +4,6 @@
 
 from __future__ import annotations as _future_annotations
 
-from collections.abc import Generator
 from typing import TYPE_CHECKING, Generic, TypeVar
 
 import abc
@@ -14,6 +13,8 @@ import logging
 import pathlib
 import sqlite3
 
+import lru
+
 from catbox.blob import BlobManager
 from catbox.room import Room, RoomOptions
 from catbox.user import UserManager
@@ -27,6 +28,12 @@ if TYPE_CHECKING:
 
 Episode = TypeVar("Episode", bound=EpisodeVersion)
 
+# Versions in these states are never edited again, so their rows can be
+# cached until save_state() moves them on.
+_CACHEABLE_STATES = frozenset(
+    {EpisodeState.PUBLISHED, EpisodeState.SUPERSEDED, EpisodeState.DISCARDED},
+)
+
 
 class OptionSupport(enum.Enum):
     NOT_SUPPORTED = None
@@ -45,6 +52,9 @@ class GameEngine(abc.ABC, Generic[Episode]):
         pass
 
     _ident: str
+    _revision: int
+    _version_cache: lru.LRU[int, dict[int, sqlite3.Row]]
+    _listing_cache: dict[EpisodeState, tuple[int, list[Episode]]]
 
     _logger: logging.Logger
     _cursor: sqlite3.Cursor
@@ -60,6 +70,9 @@ class GameEngine(abc.ABC, Generic[Episode]):
         users: UserManager,
     ) -> None:
         self._ident = ident
+        self._revision = 0
+        self._version_cache = lru.LRU(256)
+        self._listing_cache = {}
         self._logger = logger
         self._cursor = cursor.cursor()
         self._cursor.row_factory = sqlite3.Row  # type: ignore[assignment]
@@ -80,34 +93,42 @@ class GameEngine(abc.ABC, Generic[Episode]):
     def ident(self) -> str:
         return self._ident
 
+    @property
+    def revision(self) -> int:
+        """
+        Counter that is bumped whenever this engine writes an episode change,
+        so that anything derived from the episode listings can be cached.
+        """
+        return self._revision
+
     @property
     @abc.abstractmethod
     def description(self) -> str:
         pass
 
     def get_episode_meta(self, episode_id: int) -> EpisodeMeta | None:
+        # The episode and its versions are fetched as one join; the episode's
+        # own columns are repeated on each version row.
         self._cursor.execute(
-            """SELECT episode_id, user_id, title, description
-            FROM Episode WHERE game_engine = ? AND episode_id = ?""",
+            """SELECT user_id, title, description, state, version, version_updated
+            FROM Episode NATURAL LEFT JOIN EpisodeVersion
+            WHERE game_engine = ? AND episode_id = ?
+            ORDER BY version""",
             (self._ident, episode_id),
         )
 
-        main = self._cursor.fetchone()
+        rows = self._cursor.fetchall()
 
-        if not main:
+        if not rows:
             return None
 
+        main = rows[0]
         user = self._get_user(main["user_id"])
 
-        self._cursor.execute(
-            """SELECT state, version, version_updated
-            FROM EpisodeVersion WHERE episode_id = ?""",
-            (episode_id,),
-        )
-
         versions = {
             row["version"]: (row["state"], datetime.datetime.fromisoformat(row["version_updated"]))
-            for row in self._cursor.fetchall()
+            for row in rows
+            if row["version"] is not None
         }
 
         return EpisodeMeta(
@@ -145,23 +166,30 @@ class GameEngine(abc.ABC, Generic[Episode]):
         )
 
         self._cursor.connection.commit()
+        self._revision += 1
         return row["version"] + 1
 
     def get_episode_version(self, episode_id: int, version: int) -> Episode:
+        # Only the row is cached: each caller gets its own Episode, as rooms
+        # and save_state() modify the one they are given.
+        row = None
         if version == 0:
             version = self._get_or_create_draft_version(episode_id)
+        elif cached := self._version_cache.get(episode_id):
+            row = cached.get(version)
 
-        self._cursor.execute(
-            """SELECT user_id, title, state, description, data
-            FROM Episode NATURAL JOIN EpisodeVersion
-            WHERE game_engine = ? AND episode_id = ? AND version = ?""",
-            (self._ident, episode_id, version),
-        )
+        if row is None:
+            self._cursor.execute(
+                """SELECT user_id, title, state, description, data
+                FROM Episode NATURAL JOIN EpisodeVersion
+                WHERE game_engine = ? AND episode_id = ? AND version = ?""",
+                (self._ident, episode_id, version),
+            )
 
-        row = self._cursor.fetchone()
+            row = self._cursor.fetchone()
 
-        if not row:
-            raise ValueError
+            if not row:
+                raise ValueError
 
         user = self._get_user(row["user_id"])
 
@@ -175,8 +203,19 @@ class GameEngine(abc.ABC, Generic[Episode]):
             EpisodeState(row["state"]),
         )
         self._load_data(episode, row["data"])
+
+        if episode.state in _CACHEABLE_STATES:
+            if episode_id not in self._version_cache:
+                self._version_cache[episode_id] = {}
+            self._version_cache[episode_id][version] = row
+
         return episode
 
+    def _invalidate(self, episode_id: int) -> None:
+        self._revision += 1
+        if episode_id in self._version_cache:
+            del self._version_cache[episode_id]
+
     @abc.abstractmethod
     def _load_data(self, episode: Episode, data: str) -> None:
         pass
@@ -186,7 +225,12 @@ class GameEngine(abc.ABC, Generic[Episode]):
             return user
         raise RuntimeError
 
-    def list_episodes(self, state: EpisodeState) -> Generator[Episode, None, None]:
+    def list_episodes(self, state: EpisodeState) -> list[Episode]:
+        cached = self._listing_cache.get(state)
+        # Callers get their own list, so that they cannot change the cached one.
+        if cached and cached[0] == self._revision:
+            return list(cached[1])
+
         self._cursor.execute(
             """SELECT episode_id, MAX(version) as version, user_id, title, description, data
             FROM Episode NATURAL JOIN EpisodeVersion
@@ -194,7 +238,10 @@ class GameEngine(abc.ABC, Generic[Episode]):
             (self._ident, state),
         )
 
-        for row in self._cursor:
+        # The rows are fetched up front: callers look up more details on the
+        # same cursor while working through the list.
+        episodes = []
+        for row in self._cursor.fetchall():
             user = self._get_user(row["user_id"])
             episode = self._episode(
                 row["episode_id"],
@@ -206,7 +253,10 @@ class GameEngine(abc.ABC, Generic[Episode]):
                 state,
             )
             self._load_data(episode, row["data"])
-            yield episode
+            episodes.append(episode)
+
+        self._listing_cache[state] = (self._revision, episodes)
+        return list(episodes)
 
     def list_user_episodes(self, user: User) -> list[EpisodeMeta]:
         self._cursor.execute(
@@ -214,6 +264,7 @@ class GameEngine(abc.ABC, Generic[Episode]):
             SELECT episode_id, user_id, title, description, state, version, version_updated
             FROM Episode NATURAL LEFT JOIN EpisodeVersion
             WHERE game_engine = ? AND user_id = ?
+            ORDER BY episode_id, version
             """,
             (self._ident, user.user_id),
         )
@@ -286,6 +337,7 @@ class GameEngine(abc.ABC, Generic[Episode]):
             (new_episode_id, 1, ""),
         )
         self._cursor.connection.commit()
+        self._revision += 1
 
         return EpisodeMeta(new_episode_id, self._ident, user, title, "", {})
 
@@ -309,6 +361,7 @@ class GameEngine(abc.ABC, Generic[Episode]):
             (str(episode.serialise), episode.id, episode.version),
         )
         self._cursor.connection.commit()
+        self._invalidate(episode.id)
 
     def save_state(self, episode: Episode, state: EpisodeState) -> None:
         self._cursor.execute(
@@ -332,6 +385,7 @@ class GameEngine(abc.ABC, Generic[Episode]):
             )
 
         self._cursor.connection.commit()
+        self._invalidate(episode.id)
 
     def blob_for_id(self, blob_id: str | dict[str, str] | None) -> Blob | None:
         if not blob_id:
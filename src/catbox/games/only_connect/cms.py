@@ -16,7 +16,7 @@ from catbox.engine import EpisodeState, JSONDict
 from catbox.room import Endpoint, Room, Socket, command, command_no_log
 from catbox.site.state import CatBoxContext
 from catbox.static import DocResponse
-from dom import Document, Element
+from dom import Document, Element, RawHTML
 from webapp import Request, ResponseProtocol
 
 from .episode import (
@@ -53,51 +53,67 @@ class OnlyConnectViewRoom(Room):
 
 class OnlyConnectViewEndpoint(Endpoint):
     room: OnlyConnectViewRoom | OnlyConnectEditRoom
+    _main: RawHTML | None
 
     def __init__(self, room: OnlyConnectViewRoom | OnlyConnectEditRoom) -> None:
         super().__init__(room)
+        self._main = None
 
     def __str__(self) -> str:
         return "CMS (Re)View"
 
     async def on_join(self, _: CatBoxContext, __: Request) -> ResponseProtocol:
+        episode = self.room.episode
+
+        # A view room's episode never changes, so its body is only rendered once.
+        # The edit room shares this endpoint, but its episode is edited in place.
+        main = self._main
+        if main is None:
+            main = RawHTML(self._render_main(episode).html)
+            if isinstance(self.room, OnlyConnectViewRoom):
+                self._main = main
+
         return DocResponse(
             Document(
-                f'Preview: "{self.room.episode.title}"',
-                Element(
-                    "main",
-                    Element(
-                        "header",
-                        Element("h1", f'"{self.room.episode.title}"'),
-                        class_="left-slant",
-                    ),
-                    Element(
-                        "article",
-                        Element("div", self.room.episode.full_description, class_="usertext"),
-                        class_="panel",
-                    ),
-                    section_to_element(
-                        self.room.episode.connections_round,
-                        "Connections",
-                        "Work out the connection",
-                        "connections",
-                        editable=False,
-                    ),
-                    section_to_element(
-                        self.room.episode.completions_round,
-                        "Completions",
-                        "Complete the sequence (finding the fourth element)",
-                        "completions",
-                        editable=False,
-                    ),
-                    walls_to_element(self.room.episode.connecting_walls, editable=False),
-                    missing_vowels_to_element(self.room.episode.missing_vowels, editable=False),
-                    id="main",
-                ),
-                styles=["/defs.css", "/style.css", f"/{self.room.episode.engine_ident}/edit.css"],
+                f'Preview: "{episode.title}"',
+                main,
+                styles=["/defs.css", "/style.css", f"/{episode.engine_ident}/edit.css"],
             ),
         )
 
+    @staticmethod
+    def _render_main(episode: OnlyConnectEpisode) -> Element:
+        return Element(
+            "main",
+            Element(
+                "header",
+                Element("h1", f'"{episode.title}"'),
+                class_="left-slant",
+            ),
+            Element(
+                "article",
+                Element("div", episode.full_description, class_="usertext"),
+                class_="panel",
+            ),
+            section_to_element(
+                episode.connections_round,
+                "Connections",
+                "Work out the connection",
+                "connections",
+                editable=False,
+            ),
+            section_to_element(
+                episode.completions_round,
+                "Completions",
+                "Complete the sequence (finding the fourth element)",
+                "completions",
+                editable=False,
+            ),
+            walls_to_element(episode.connecting_walls, editable=False),
+            missing_vowels_to_element(episode.missing_vowels, editable=False),
+            id="main",
+        )
+
 
 class FullEpisodeHelper:
     connections_round: SixQuestions
@@ -510,8 +526,17 @@ class OnlyConnectEditEndpoint(Endpoint):
         )
 
 
-def range_number(number: str, v_min: int, v_max: int) -> int:
-    element_number = int(number)
+def range_number(number: str | int, v_min: int, v_max: int) -> int:
+    # The editor may send an index already decoded as a number. Strings are
+    # checked before converting, so that anything else (None, lists, "1_0",
+    # " 3") is rejected as the ValueError callers handle rather than a TypeError.
+    if type(number) is int:
+        element_number = number
+    elif isinstance(number, str) and number.isascii() and number.isdigit():
+        element_number = int(number)
+    else:
+        raise ValueError
+
     if element_number < v_min or element_number >= v_max:
         raise ValueError
 
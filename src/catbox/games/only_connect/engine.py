@@ -4,9 +4,10 @@
 
 from __future__ import annotations as _future_annotations
 
-import json
 import pathlib
 
+import orjson
+
 from catbox.engine import GameEngine, OptionSupport
 from catbox.room import Room, RoomOptions
 
@@ -23,11 +24,13 @@ from .episode import (
 )
 from .play import OnlyConnectRoom
 
+_RESOURCES_DIR = (pathlib.Path(__file__).parent / "resources").resolve()
+
 
 class OnlyConnectEngine(GameEngine[OnlyConnectEpisode]):
     @classmethod
     def resources(cls) -> pathlib.Path:
-        return (pathlib.Path(__file__).parent / "resources").resolve()
+        return _RESOURCES_DIR
 
     @property
     def _episode(self) -> type[OnlyConnectEpisode]:
@@ -52,8 +55,8 @@ class OnlyConnectEngine(GameEngine[OnlyConnectEpisode]):
 
     def _load_data(self, episode: OnlyConnectEpisode, data: str) -> None:
         try:
-            contents = json.loads(data)
-        except json.JSONDecodeError:
+            contents = orjson.loads(data)
+        except orjson.JSONDecodeError:
             contents = {}
 
         connections = contents.get("connections")
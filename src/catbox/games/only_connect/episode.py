@@ -7,10 +7,11 @@ from __future__ import annotations as _future_annotations
 from collections.abc import Iterable, Sequence
 from typing import Literal
 
-import json
 import random
 import re
 
+import orjson
+
 from catbox.blob import Blob
 from catbox.engine import EpisodeVersion, JSONDict
 
@@ -34,6 +35,8 @@ class OnlyConnectQuestion:
     details: str
     elements: list[str | Blob]
 
+    __slots__ = ("question_type", "connection", "details", "elements")
+
     def __init__(
         self,
         question_type: str,
@@ -75,6 +78,8 @@ class OnlyConnectQuestion:
 class OnlyConnectTextQuestion(OnlyConnectQuestion):
     elements: list[str]  # type: ignore[assignment]
 
+    __slots__ = ()
+
     def __init__(
         self,
         question_type: str,
@@ -188,6 +193,8 @@ class MissingVowelsGroup:
     connection: str
     words: list[tuple[str, str] | None]
 
+    __slots__ = ("connection", "words")
+
     def __init__(self, connection: str, words: list[list[str]]) -> None:
         self.connection = connection
         self.words = [(word[1], word[2]) for word in words]
@@ -241,7 +248,7 @@ class OnlyConnectEpisode(EpisodeVersion):
 
     @property
     def serialise(self) -> str:
-        return json.dumps(self.json())
+        return orjson.dumps(self.json()).decode()
 
     @property
     def has_connections_round(self) -> bool:
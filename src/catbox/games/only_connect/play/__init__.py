@@ -32,6 +32,8 @@ class TeamData:
     name: str
     score: int
 
+    __slots__ = ("team_id", "name", "score")
+
     def __init__(self, name: str) -> None:
         self.team_id = uuid.uuid4().hex
         self.name = name
@@ -54,8 +56,9 @@ class OnlyConnectRoom(Room):
 
     current_round: RoundTracker
     current_state: RoundHandler | None
+    episode_info: JSONDict
 
-    __slots__ = ("episode", "teams", "endpoints", "current_round", "current_state")
+    __slots__ = ("episode", "teams", "endpoints", "current_round", "current_state", "episode_info")
 
     def __init__(
         self,
@@ -68,6 +71,20 @@ class OnlyConnectRoom(Room):
         self.current_state = None
         self.teams = tuple(TeamData(team) for team in options.teams[0:2])  # type: ignore[assignment]
 
+        # The episode does not change during a game, so what every client is
+        # sent on setup is only built once.
+        self.episode_info = {
+            "title": episode.title,
+            "author": episode.author,
+            "description": episode.full_description,
+            "rounds": {  # type: ignore[dict-item] # JSON typing is hard
+                "connections": episode.has_connections_round,
+                "completions": episode.has_completions_round,
+                "walls": episode.has_connecting_walls(len(self.teams)),  # type: ignore[arg-type]
+                "vowels": episode.has_missing_vowels,
+            },
+        }
+
         super().__init__(
             logger,
             gm=OnlyConnectGMEndpoint(self),
@@ -157,17 +174,7 @@ class OnlyConnectEndpoint(Endpoint, abc.ABC):
     async def setup(self, _: Socket) -> JSONDict:
         return {
             "cmd": "setup",
-            "episode": {
-                "title": self.room.episode.title,
-                "author": self.room.episode.author,
-                "description": self.room.episode.full_description,
-                "rounds": {
-                    "connections": self.room.episode.has_connections_round,
-                    "completions": self.room.episode.has_completions_round,
-                    "walls": self.room.episode.has_connecting_walls(len(self.room.teams)),  # type: ignore[arg-type]
-                    "vowels": self.room.episode.has_missing_vowels,
-                },
-            },
+            "episode": self.room.episode_info,
             "state": self._state_representation(),
         }
 
@@ -205,7 +212,13 @@ class OnlyConnectPreviewEndpoint(OnlyConnectEndpoint):
             self._error("Attempting to toggle when not on connecting wall", socket=socket)
             return
 
-        for _ in self.room.current_state.toggle(word):
+        state = self.room.current_state
+        if not state.toggle(word):
+            return
+
+        # Show what became selected, then the result if it completed a group.
+        await self.room.fanout()
+        if state.resolve_selection():
             await self.room.fanout()
 
 
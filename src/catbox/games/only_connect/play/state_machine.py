@@ -4,8 +4,8 @@
 
 from __future__ import annotations as _future_annotations
 
-from collections.abc import Iterator
-from typing import TYPE_CHECKING, Literal
+from collections.abc import Callable, Set
+from typing import TYPE_CHECKING, ClassVar, Literal
 
 import abc
 import enum
@@ -74,12 +74,51 @@ class PossibleActions(enum.StrEnum):
     START_NEXT_ROUND = "START_NEXT_ROUND"
 
 
+# The action sets which do not depend on the teams are shared, rather than rebuilt per call.
+_NEXT_QUESTION = frozenset({PossibleActions.NEXT_QUESTION})
+_START_NEXT_ROUND = frozenset({PossibleActions.START_NEXT_ROUND})
+_LOCK_IN = frozenset({PossibleActions.LOCK_IN})
+_REVEAL_FOR_STEAL = frozenset({PossibleActions.REVEAL_FOR_STEAL})
+_SCORE_ACTIONS = frozenset(
+    {PossibleActions.SCORE_TEAM1, PossibleActions.SCORE_TEAM2, PossibleActions.SCORE_INCORRECT},
+)
+
+# Points for a correct answer, indexed by the number of clues revealed.
+_POINTS = (0, 5, 3, 2, 1)
+
+# The selectable questions in a connections or completions round, in board order.
+_QUESTION_ACTIONS = (
+    PossibleActions.SELECT_TWO_REEDS,
+    PossibleActions.SELECT_LION,
+    PossibleActions.SELECT_TWISTED_FLAX,
+    PossibleActions.SELECT_HORNED_VIPER,
+    PossibleActions.SELECT_WATER,
+    PossibleActions.SELECT_EYE_OF_HORUS,
+)
+
+
 class RoundHandler(abc.ABC):
+    # Action to the (unbound) handler method for it, resolved once per class.
+    _actions: dict[PossibleActions, Callable[[RoundHandler], bool]] = {}
+
     room: OnlyConnectRoom
 
+    __slots__ = ("room",)
+
     def __init__(self, room: OnlyConnectRoom) -> None:
         self.room = room
 
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+
+        # Each action is handled by the method of the same name, lower-cased.
+        # Starting the next round is handled by the room, so has no method.
+        cls._actions = {
+            action: method
+            for action in PossibleActions
+            if (method := getattr(cls, action.lower(), None))
+        }
+
     @abc.abstractmethod
     def public_state(self) -> JSONDict | None:
         pass
@@ -88,7 +127,7 @@ class RoundHandler(abc.ABC):
         return self.public_state()
 
     @abc.abstractmethod
-    def possible_actions(self) -> set[PossibleActions]:
+    def possible_actions(self) -> Set[PossibleActions]:
         pass
 
     def next_question(self) -> bool:
@@ -134,26 +173,9 @@ class RoundHandler(abc.ABC):
         return False
 
     def do(self, choice: PossibleActions) -> bool:
-        actions = {
-            PossibleActions.NEXT_QUESTION: self.next_question,
-            PossibleActions.SELECT_TWO_REEDS: self.select_two_reeds,
-            PossibleActions.SELECT_LION: self.select_lion,
-            PossibleActions.SELECT_TWISTED_FLAX: self.select_twisted_flax,
-            PossibleActions.SELECT_HORNED_VIPER: self.select_horned_viper,
-            PossibleActions.SELECT_WATER: self.select_water,
-            PossibleActions.SELECT_EYE_OF_HORUS: self.select_eye_of_horus,
-            PossibleActions.NEXT_CLUE: self.next_clue,
-            PossibleActions.LOCK_IN: self.lock_in,
-            PossibleActions.REVEAL_FOR_STEAL: self.reveal_for_steal,
-            PossibleActions.SCORE_TEAM1: self.score_team1,
-            PossibleActions.SCORE_TEAM2: self.score_team2,
-            PossibleActions.SCORE_STEAL: self.score_steal,
-            PossibleActions.SCORE_INCORRECT: self.score_incorrect,
-        }
-
-        call = actions.get(choice)
+        call = self._actions.get(choice)
 
-        return call() if call else False
+        return call(self) if call else False
 
 
 class StandardRoundState(RoundHandler):
@@ -166,19 +188,35 @@ class StandardRoundState(RoundHandler):
     revealed_clues: int
     max_revealed: int
 
+    __slots__ = (
+        "state",
+        "active_team",
+        "data",
+        "available",
+        "current_question",
+        "revealed_clues",
+        "max_revealed",
+    )
+
+    _STATE_ACTIONS: ClassVar[dict[InRoundState, frozenset[PossibleActions]]] = {
+        InRoundState.PRE_ROUND: _NEXT_QUESTION,
+        InRoundState.QUESTION_SELECTION: frozenset(),
+        InRoundState.QUESTION_ACTIVE: frozenset(
+            {PossibleActions.LOCK_IN, PossibleActions.NEXT_CLUE},
+        ),
+        InRoundState.STEALING: frozenset(
+            {PossibleActions.SCORE_STEAL, PossibleActions.SCORE_INCORRECT},
+        ),
+        InRoundState.ANSWER_REVEALED: _NEXT_QUESTION,
+        InRoundState.POST_ROUND: _START_NEXT_ROUND,
+    }
+
     def __init__(self, room: OnlyConnectRoom, data: SixQuestions) -> None:
         super().__init__(room)
 
         self.state = InRoundState.PRE_ROUND
         self.data = data
-        self.available = [
-            PossibleActions.SELECT_TWO_REEDS,
-            PossibleActions.SELECT_LION,
-            PossibleActions.SELECT_TWISTED_FLAX,
-            PossibleActions.SELECT_HORNED_VIPER,
-            PossibleActions.SELECT_WATER,
-            PossibleActions.SELECT_EYE_OF_HORUS,
-        ]
+        self.available = list(_QUESTION_ACTIONS)
         self.active_team = 0 if len(room.teams) == 1 else 1
         self.current_question = data[0]
 
@@ -236,18 +274,10 @@ class StandardRoundState(RoundHandler):
 
         return state
 
-    def possible_actions(self) -> set[PossibleActions]:  # -- lots of returns...
-        mapping: dict[InRoundState, set[PossibleActions]] = {
-            InRoundState.PRE_ROUND: {PossibleActions.NEXT_QUESTION},
-            InRoundState.QUESTION_SELECTION: set(),
-            InRoundState.QUESTION_ACTIVE: {PossibleActions.LOCK_IN, PossibleActions.NEXT_CLUE},
-            InRoundState.STEALING: {PossibleActions.SCORE_STEAL, PossibleActions.SCORE_INCORRECT},
-            InRoundState.ANSWER_REVEALED: {PossibleActions.NEXT_QUESTION},
-            InRoundState.POST_ROUND: {PossibleActions.START_NEXT_ROUND},
-        }
-
-        if self.state in mapping:
-            return mapping[self.state]
+    def possible_actions(self) -> Set[PossibleActions]:  # -- lots of returns...
+        actions = self._STATE_ACTIONS.get(self.state)
+        if actions is not None:
+            return actions
 
         # LOCKED_IN
         if len(self.room.teams) == 1:
@@ -335,10 +365,8 @@ class StandardRoundState(RoundHandler):
         if self.state != InRoundState.LOCKED_IN:
             return False
 
-        self.room.teams[team].score += [0, 5, 3, 2, 1][self.revealed_clues]  # type: ignore[misc]
-
-        self.state = InRoundState.ANSWER_REVEALED
-        self.revealed_clues = SLOTS_PER_CONNECTION
+        self.room.teams[team].score += _POINTS[self.revealed_clues]  # type: ignore[misc]
+        self._reveal_answer()
         return True
 
     def score_steal(self) -> bool:
@@ -346,17 +374,19 @@ class StandardRoundState(RoundHandler):
             return False
 
         self.room.teams[1 - self.active_team].score += 1
-        self.state = InRoundState.ANSWER_REVEALED
-        self.revealed_clues = SLOTS_PER_CONNECTION
+        self._reveal_answer()
         return True
 
     def score_incorrect(self) -> bool:
         if self.state not in {InRoundState.LOCKED_IN, InRoundState.STEALING}:
             return False
 
+        self._reveal_answer()
+        return True
+
+    def _reveal_answer(self) -> None:
         self.state = InRoundState.ANSWER_REVEALED
         self.revealed_clues = SLOTS_PER_CONNECTION
-        return True
 
     def reveal_for_steal(self) -> bool:
 
@@ -369,17 +399,41 @@ class MissingVowelsState(RoundHandler):
     state: InRoundState
 
     questions: list[MissingVowelsGroup]
+    group_pairs: list[list[tuple[str, str]]]
     current_group: list[tuple[str, str]]
 
-    group_index: int = -1
-    question_index: int = -1
+    group_index: int
+    question_index: int
 
-    def __init__(self, room: OnlyConnectRoom, questions: list[MissingVowelsGroup]) -> None:
+    __slots__ = (
+        "state",
+        "questions",
+        "group_pairs",
+        "current_group",
+        "group_index",
+        "question_index",
+    )
+
+    def __init__(
+        self,
+        room: OnlyConnectRoom,
+        questions: list[MissingVowelsGroup | None],
+    ) -> None:
         super().__init__(room)
 
         self.state = InRoundState.PRE_ROUND
-        self.questions = [group for group in questions if group.valid_pairs]
+        self.questions = []
+        self.group_pairs = []
         self.current_group = []
+        self.group_index = -1
+        self.question_index = -1
+
+        # Each prompt is checked against its answer once, when the round starts,
+        # and groups with nothing playable are dropped.
+        for group in questions:
+            if group and (pairs := list(group.valid_pairs)):
+                self.questions.append(group)
+                self.group_pairs.append(pairs)
 
     def public_state(self) -> JSONDict:
         return {
@@ -400,18 +454,14 @@ class MissingVowelsState(RoundHandler):
 
         return state
 
-    def possible_actions(self) -> set[PossibleActions]:
+    def possible_actions(self) -> Set[PossibleActions]:
         if self.state == InRoundState.QUESTION_ACTIVE:
-            return {
-                PossibleActions.SCORE_TEAM1,
-                PossibleActions.SCORE_TEAM2,
-                PossibleActions.SCORE_INCORRECT,
-            }
+            return _SCORE_ACTIONS
 
         if self.state == InRoundState.POST_ROUND:
-            return {PossibleActions.START_NEXT_ROUND}
+            return _START_NEXT_ROUND
 
-        return {PossibleActions.NEXT_QUESTION}
+        return _NEXT_QUESTION
 
     def active_question(self) -> JSONDict | None:
         if self.state == InRoundState.QUESTION_ACTIVE:
@@ -435,11 +485,7 @@ class MissingVowelsState(RoundHandler):
             self.state = InRoundState.POST_ROUND
             return
 
-        self.current_group = list(self.questions[self.group_index].valid_pairs)
-
-        if not self.current_group:
-            self.next_group()
-
+        self.current_group = self.group_pairs[self.group_index]
         self.question_index = 0
         self.state = InRoundState.QUESTION_ACTIVE
 
@@ -459,25 +505,20 @@ class MissingVowelsState(RoundHandler):
         return True
 
     def score_team1(self) -> bool:
-        if self.state != InRoundState.QUESTION_ACTIVE:
-            return False
-
-        self.room.teams[0].score += 1
-        self.state = InRoundState.ANSWER_REVEALED
-        return True
+        return self._score(0)
 
     def score_team2(self) -> bool:
-        if self.state != InRoundState.QUESTION_ACTIVE:
-            return False
-
-        self.room.teams[1].score += 1  # type: ignore[misc]
-        self.state = InRoundState.ANSWER_REVEALED
-        return True
+        return self._score(1)
 
     def score_incorrect(self) -> bool:
+        return self._score(None)
+
+    def _score(self, team: Literal[0, 1] | None) -> bool:
         if self.state != InRoundState.QUESTION_ACTIVE:
             return False
 
+        if team is not None:
+            self.room.teams[team].score += 1  # type: ignore[misc]
         self.state = InRoundState.ANSWER_REVEALED
         return True
 
@@ -493,13 +534,24 @@ class ActiveWall:
     confirming_group: int | None
     is_group_revealed: bool
 
+    __slots__ = (
+        "wall",
+        "grouped",
+        "ungrouped",
+        "not_found",
+        "selected",
+        "strikes",
+        "groups",
+        "confirming_group",
+        "is_group_revealed",
+    )
+
     def __init__(self, wall: ConnectingWall) -> None:
         self.wall = wall
 
-        words = list(wall.clues)
-        random.shuffle(words)
-
-        self.ungrouped = words
+        # Sampling every clue gives a shuffled copy without the extra list.
+        clues = wall.clues
+        self.ungrouped = random.sample(clues, len(clues))
         self.grouped = []
         self.not_found = []
         self.selected = []
@@ -508,29 +560,30 @@ class ActiveWall:
         self.confirming_group = None
         self.is_group_revealed = True
 
-    def toggle(self, word: str) -> Iterator[None]:
+    def toggle(self, word: str) -> bool:
         try:
             index = self.ungrouped.index(word)
         except ValueError:
-            return
+            return False
 
         if index in self.selected:
             self.selected.remove(index)
-            yield None
-            return
+        else:
+            self.selected.append(index)
 
-        self.selected.append(index)
-        # Update now to show something became selected
-        yield None
+        return True
 
+    def resolve_selection(self) -> bool:
+        # Called after the selection has been shown, so that a completed
+        # group is seen being picked before it is matched (or rejected).
         if len(self.selected) != SLOTS_PER_CONNECTION:
-            return
+            return False
 
         selected_words = [self.ungrouped[index] for index in self.selected]
         self._check_match_group(selected_words)
 
         self.selected = []
-        yield None
+        return True
 
     def _check_match_group(self, words: list[str]) -> None:
         for group in self.wall:
@@ -611,6 +664,14 @@ class ConnectingWallState(RoundHandler):
     active_team: Literal[0, 1]
     active_wall: ActiveWall | None
 
+    __slots__ = ("state", "available_walls", "active_team", "active_wall")
+
+    _STATE_ACTIONS: ClassVar[dict[InRoundState, frozenset[PossibleActions]]] = {
+        InRoundState.PRE_ROUND: _NEXT_QUESTION,
+        InRoundState.QUESTION_SELECTION: frozenset(),
+        InRoundState.POST_ROUND: _START_NEXT_ROUND,
+    }
+
     def __init__(self, room: OnlyConnectRoom, walls: tuple[ConnectingWall, ConnectingWall]) -> None:
         super().__init__(room)
 
@@ -623,36 +684,28 @@ class ConnectingWallState(RoundHandler):
             self.active_team = 1
 
     def public_state(self) -> JSONDict:
-        return {
-            "round": RoundTracker.CONNECTING_WALLS,
-            "state": self.state,
-            "active_team": self.room.teams[self.active_team].json(),  # type: ignore[misc]
-            "available": [bool(wall) for wall in self.available_walls],  # type: ignore[dict-item]
-            "current": self.active_wall.json() if self.active_wall else None,
-        }
+        return self._state(admin=False)
 
     def admin_state(self) -> JSONDict:
+        return self._state(admin=True)
+
+    def _state(self, *, admin: bool) -> JSONDict:
         return {
             "round": RoundTracker.CONNECTING_WALLS,
             "state": self.state,
             "active_team": self.room.teams[self.active_team].json(),  # type: ignore[misc]
             "available": [bool(wall) for wall in self.available_walls],  # type: ignore[dict-item]
-            "current": self.active_wall.json(admin=True) if self.active_wall else None,
-        }
-
-    def possible_actions(self) -> set[PossibleActions]:  # -- lots of returns...
-        mapping: dict[InRoundState, set[PossibleActions]] = {
-            InRoundState.PRE_ROUND: {PossibleActions.NEXT_QUESTION},
-            InRoundState.QUESTION_SELECTION: set(),
-            InRoundState.POST_ROUND: {PossibleActions.START_NEXT_ROUND},
+            "current": self.active_wall.json(admin=admin) if self.active_wall else None,
         }
 
-        if self.state in mapping:
-            return mapping[self.state]
+    def possible_actions(self) -> Set[PossibleActions]:  # -- lots of returns...
+        actions = self._STATE_ACTIONS.get(self.state)
+        if actions is not None:
+            return actions
 
         # The players playing a wall can give up at any time.
         if self.state != InRoundState.LOCKED_IN and self.active_wall:
-            return {PossibleActions.LOCK_IN}
+            return _LOCK_IN
 
         # If we have confirmed all groups, move on to the next wall/round
         if (
@@ -660,10 +713,10 @@ class ConnectingWallState(RoundHandler):
             and self.active_wall.confirming_group == SLOTS_PER_CONNECTION - 1
             and self.active_wall.is_group_revealed
         ):
-            return {PossibleActions.NEXT_QUESTION}
+            return _NEXT_QUESTION
 
         if self.active_wall and self.active_wall.is_group_revealed:
-            return {PossibleActions.REVEAL_FOR_STEAL}
+            return _REVEAL_FOR_STEAL
 
         return {
             PossibleActions.SCORE_TEAM1 if self.active_team == 0 else PossibleActions.SCORE_TEAM2,
@@ -725,16 +778,21 @@ class ConnectingWallState(RoundHandler):
         self.state = InRoundState.LOCKED_IN
         return True
 
-    def toggle(self, word: str) -> Iterator[None]:
+    def toggle(self, word: str) -> bool:
         if not self.active_wall:
-            return
+            return False
+
+        return self.active_wall.toggle(word)
+
+    def resolve_selection(self) -> bool:
+        if not self.active_wall:
+            return False
 
         try:
-            yield from self.active_wall.toggle(word)
+            return self.active_wall.resolve_selection()
         except OverflowError:
-            yield None
             self.lock_in()
-            yield None
+            return True
 
     def reveal_for_steal(self) -> bool:
         if self.state != InRoundState.LOCKED_IN or not self.active_wall:
@@ -744,32 +802,15 @@ class ConnectingWallState(RoundHandler):
         return True
 
     def score_team1(self) -> bool:
-        if (
-            self.state != InRoundState.LOCKED_IN
-            or not self.active_wall
-            or self.active_wall.confirming_group is None
-            or self.active_wall.is_group_revealed
-        ):
-            return False
-
-        self.room.teams[0].score += 1
-        self.active_wall.is_group_revealed = True
-        return True
+        return self._score_group(0)
 
     def score_team2(self) -> bool:
-        if (
-            self.state != InRoundState.LOCKED_IN
-            or not self.active_wall
-            or self.active_wall.confirming_group is None
-            or self.active_wall.is_group_revealed
-        ):
-            return False
-
-        self.room.teams[1].score += 1  # type: ignore[misc]
-        self.active_wall.is_group_revealed = True
-        return True
+        return self._score_group(1)
 
     def score_incorrect(self) -> bool:
+        return self._score_group(None)
+
+    def _score_group(self, team: Literal[0, 1] | None) -> bool:
         if (
             self.state != InRoundState.LOCKED_IN
             or not self.active_wall
@@ -778,5 +819,7 @@ class ConnectingWallState(RoundHandler):
         ):
             return False
 
+        if team is not None:
+            self.room.teams[team].score += 1  # type: ignore[misc]
         self.active_wall.is_group_revealed = True
         return True
@@ -227,21 +227,14 @@ class ThisOrThatEditor(Endpoint):
 
     @command
     async def reorder(self, socket: Socket, order: list[str]) -> None:
-        output = []
-
-        for uuid in order:
-            index = self.room.episode.questions.index(
-                ThisOrThatQuestion(self.room.engine, uuid=uuid),
-            )
-            output.append(
-                (
-                    self.room.episode.questions[index]
-                    if index
-                    else ThisOrThatQuestion(self.room.engine, uuid=uuid)
-                ),
-            )
-
-        self.room.episode.questions = output
+        # Index the questions once, rather than searching the list (with a
+        # throwaway question to compare against) for every entry.
+        questions = {question.uuid: question for question in self.room.episode.questions}
+
+        self.room.episode.questions = [
+            questions.get(uuid) or ThisOrThatQuestion(self.room.engine, uuid=uuid)
+            for uuid in order
+        ]
         await self.save(socket)
 
     @command
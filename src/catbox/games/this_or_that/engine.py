@@ -4,10 +4,11 @@
 
 from __future__ import annotations as _future_annotations
 
-import json
 import pathlib
 from uuid import uuid4
 
+import orjson
+
 from catbox.engine import EpisodeVersion, GameEngine, JSONDict, OptionSupport
 from catbox.room import Room, RoomOptions
 
@@ -15,6 +16,8 @@ from .cms import ThisOrThatEditRoom, ThisOrThatPreviewRoom
 from .play import ThisOrThatRoom
 from .question import Answer, ThisOrThatQuestion
 
+_RESOURCES_DIR = (pathlib.Path(__file__).parent / "resources").resolve()
+
 
 class ThisOrThatEpisode(EpisodeVersion):
     this_category: str
@@ -30,23 +33,26 @@ class ThisOrThatEpisode(EpisodeVersion):
 
     @property
     def serialise(self) -> str:
-        return json.dumps(self.json())
-
-    @property
-    def both_possible(self) -> bool:
-        return any(q.is_this and q.is_that for q in self.questions)
-
-    @property
-    def neither_possible(self) -> bool:
-        return any(not (q.is_this or q.is_that) for q in self.questions)
+        return orjson.dumps(self.json()).decode()
+
+    def possible_answers(self) -> tuple[bool, bool]:
+        """Whether any question's answer is both, and whether any is neither."""
+        both = neither = False
+        for q in self.questions:
+            if q.is_this:
+                both = both or q.is_that
+            elif not q.is_that:
+                neither = True
+            if both and neither:
+                break
+        return both, neither
 
     def __len__(self) -> int:
         return sum(1 for q in self.questions if q.is_valid)
 
     @property
     def full_description(self) -> str:
-        both = self.both_possible
-        neither = self.neither_possible
+        both, neither = self.possible_answers()
         count = str(len(self))
 
         if not (both or neither):
@@ -79,7 +85,7 @@ class ThisOrThatEpisode(EpisodeVersion):
 class ThisOrThisEngine(GameEngine[ThisOrThatEpisode]):
     @classmethod
     def resources(cls) -> pathlib.Path:
-        return (pathlib.Path(__file__).parent / "resources").resolve()
+        return _RESOURCES_DIR
 
     @property
     def _episode(self) -> type[ThisOrThatEpisode]:
@@ -111,16 +117,15 @@ class ThisOrThisEngine(GameEngine[ThisOrThatEpisode]):
 
     def _load_data(self, episode: ThisOrThatEpisode, data: str) -> None:
         try:
-            contents = json.loads(data)
-        except json.JSONDecodeError:
+            contents = orjson.loads(data)
+        except orjson.JSONDecodeError:
             contents = {}
 
         episode.this_category = contents.get("this", "")
         episode.that_category = contents.get("that", "")
-        episode.questions = []
-
-        for question in contents.get("questions", []):
-            episode.questions.append(ThisOrThatQuestion(self, **question))
+        episode.questions = [
+            ThisOrThatQuestion(self, **question) for question in contents.get("questions", [])
+        ]
 
         if not episode.questions:
             episode.questions.append(ThisOrThatQuestion(self, uuid=uuid4().hex))
@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING, Any
 import abc
 import asyncio
 import enum
+import functools
 import logging
 import uuid
 
@@ -19,7 +20,7 @@ from catbox.engine import JSONDict
 from catbox.room import Endpoint, Room, RoomOptions, Socket, command
 from catbox.site.state import CatBoxContext
 from catbox.static import DocResponse
-from dom import Document, Element
+from dom import Document, Element, RawHTML
 from webapp import Request, ResponseProtocol
 
 from .question import Answer as Vote
@@ -42,6 +43,8 @@ class Audience:
     vote_record: dict[str, Vote]
     members: set[str]
 
+    __slots__ = ("room", "score", "vote_record", "members")
+
     def __init__(self) -> None:
         self.score = 0.0
         self.vote_record = {}
@@ -60,8 +63,10 @@ class Audience:
 class Team:
     id: str
     name: str
-    score: int = 0
-    vote: Vote | None = None
+    score: int
+    vote: Vote | None
+
+    __slots__ = ("id", "name", "score", "vote")
 
     def __init__(self, name: str) -> None:
         self.id = uuid.uuid4().hex
@@ -91,10 +96,16 @@ class ThisOrThatRoom(Room):
     episode: ThisOrThatEpisode
     state: GameState
     question_index: int
+    episode_info: JSONDict
+
+    _shared_state: dict[bool, JSONDict]
+    _question_key: tuple[int, GameState] | None
+    _question_state: JSONDict | None
+    _question_json: JSONDict | None
 
-    teams: list[Team] | None = None
-    audience: Audience | None = None
-    next_audience_sync: bool = False
+    teams: list[Team] | None
+    audience: Audience | None
+    next_audience_sync: bool
 
     def __init__(
         self,
@@ -106,6 +117,27 @@ class ThisOrThatRoom(Room):
         self.episode = episode
         self.state = GameState.GAME_STARTING
         self.question_index = -1  # Before the first question.
+        self._shared_state = {}
+        self._question_key = None
+        self._question_state = None
+        self._question_json = None
+        self.teams = None
+        self.audience = None
+        self.next_audience_sync = False
+
+        # The episode does not change during a game, so what every client is
+        # sent on setup is only built once.
+        has_both, has_neither = episode.possible_answers()
+        self.episode_info = {
+            "title": episode.title,
+            "author": episode.author,
+            "description": episode.full_description,
+            "this": episode.this_category,
+            "that": episode.that_category,
+            "has_both": has_both,
+            "has_neither": has_neither,
+            "question_count": len(episode),
+        }
 
         endpoints: dict[str, ThisOrThatEndpoint] = {}
 
@@ -134,6 +166,68 @@ class ThisOrThatRoom(Room):
 
         return self.episode.questions[self.question_index]
 
+    def shared_state(self, *, full_teams: bool) -> JSONDict:
+        # Endpoints only differ in whether they see full team details, and in
+        # what they add on top, so the common state is built once per change
+        # rather than once per endpoint. See _state_changed.
+        state = self._shared_state.get(full_teams)
+        if state is not None:
+            return state
+
+        question_state, question_json = self.question_state()
+        state = self._shared_state[full_teams] = {
+            "cmd": "state_change",
+            "state": self.state,
+            "teams": (  # type: ignore[dict-item]
+                [team.full() if full_teams else team.public() for team in self.teams]
+                if self.teams
+                else None
+            ),
+            "audience": self.audience.json() if self.audience else None,
+            "question": question_state,
+        }
+
+        if full_teams and question_json:
+            state["full_question"] = question_json
+
+        return state
+
+    def _state_changed(self) -> None:
+        self._shared_state.clear()
+
+    def question_state(self) -> tuple[JSONDict | None, JSONDict | None]:
+        # Every endpoint is sent the same question block (and the same full
+        # question once answers are shown), so these are built once for each
+        # question and state, rather than once per endpoint per fanout.
+        key = (self.question_index, self.state)
+        if key != self._question_key:
+            question = self.question
+            self._question_key = key
+            self._question_state = self._build_question_state(question)
+            self._question_json = question.json() if question else None
+
+        return self._question_state, self._question_json
+
+    def _build_question_state(self, question: ThisOrThatQuestion | None) -> JSONDict | None:
+        if question and self.state == GameState.QUESTION:
+            return {
+                "idx": self.question_index + 1,
+                "headline": "Question #" + str(self.question_index + 1),
+                "text": question.question_text,
+                "media": question.question_media.json() if question.question_media else None,
+            }
+
+        if question and self.state == GameState.ANSWER:
+            return {
+                "idx": self.question_index + 1,
+                "headline": self.episode.answer_text(question.answer),
+                "answer": str(question.answer),
+                "text": question.answer_text,
+                "media": question.answer_media.json() if question.answer_media else None,
+            }
+
+        return None
+
     def __str__(self) -> str:
         return self.episode.title
 
@@ -176,6 +270,7 @@ class ThisOrThatRoom(Room):
             return
 
         team.vote = vote
+        self._state_changed()
 
         await self._gather(
             (endpoint.on_vote_change() for endpoint in self.endpoints.values()),
@@ -205,6 +300,7 @@ class ThisOrThatRoom(Room):
 
             self.logger.info("Moved to question %d", self.question_index, extra={"room": self})
 
+        self._state_changed()
         await self._gather(
             (endpoint.on_state_change() for endpoint in self.endpoints.values()),
             "Error moving to question %d",
@@ -233,6 +329,7 @@ class ThisOrThatRoom(Room):
             self.audience.vote_record.clear()
 
         self.state = GameState.ANSWER
+        self._state_changed()
         self.logger.info("Revealed answer for %d", self.question_index, extra={"room": self})
 
         await self._gather(
@@ -245,6 +342,7 @@ class ThisOrThatRoom(Room):
         if not self.audience:
             return
 
+        self._state_changed()
         self.next_audience_sync = True
 
     async def audience_pinger(self) -> None:
@@ -265,47 +363,14 @@ class ThisOrThatRoom(Room):
 class ThisOrThatEndpoint(Endpoint, abc.ABC):
     room: ThisOrThatRoom
 
-    async def on_state_change(self) -> list[Exception]:
-        return await self._fanout(self._state_representation(), log=False)
+    async def on_state_change(self) -> None:
+        await self._fanout(self._state_representation())
 
     def _state_representation(self, *, full_teams: bool = False) -> JSONDict:
-        state = self.room.state
-        question = self.room.question
-        full_teams = full_teams or state == GameState.ANSWER
-
-        base: JSONDict = {
-            "cmd": "state_change",
-            "state": state,
-            "teams": (  # type: ignore[dict-item]
-                [team.full() if full_teams else team.public() for team in self.room.teams]
-                if self.room.teams
-                else None
-            ),
-            "audience": self.room.audience.json() if self.room.audience else None,
-        }
+        full_teams = full_teams or self.room.state == GameState.ANSWER
 
-        if full_teams and question:
-            base["full_question"] = question.json()
-
-        if question and state == GameState.QUESTION:
-            base["question"] = {
-                "idx": self.room.question_index + 1,
-                "headline": "Question #" + str(self.room.question_index + 1),
-                "text": question.question_text,
-                "media": question.question_media.json() if question.question_media else None,
-            }
-        elif question and state == GameState.ANSWER:
-            base["question"] = {
-                "idx": self.room.question_index + 1,
-                "headline": self.room.episode.answer_text(question.answer),
-                "answer": str(question.answer),
-                "text": question.answer_text,
-                "media": question.answer_media.json() if question.answer_media else None,
-            }
-        else:
-            base["question"] = None
-
-        return base
+        # Copied, as the subclasses add their own entries.
+        return dict(self.room.shared_state(full_teams=full_teams))
 
     def _can_vote(self, _: str) -> bool:
         return False
@@ -318,16 +383,7 @@ class ThisOrThatEndpoint(Endpoint, abc.ABC):
         return {
             "cmd": "setup",
             "state": self.room.state,
-            "episode": {
-                "title": self.room.episode.title,
-                "author": self.room.episode.author,
-                "description": self.room.episode.full_description,
-                "this": self.room.episode.this_category,
-                "that": self.room.episode.that_category,
-                "has_both": self.room.episode.both_possible,
-                "has_neither": self.room.episode.neither_possible,
-                "question_count": len(self.room.episode),
-            },
+            "episode": self.room.episode_info,
             "status": self._state_representation(),
         }
 
@@ -350,8 +406,7 @@ class ThisOrThatGameManager(ThisOrThatEndpoint):
     def _state_representation(self, *, full_teams: bool = True) -> JSONDict:
         base = super()._state_representation(full_teams=full_teams)
 
-        question = self.room.question
-        base["full_question"] = question.json() if question else None
+        base["full_question"] = self.room.question_state()[1]
 
         return base
 
@@ -554,27 +609,35 @@ class ThisOrThatScoreOverlay(ThisOrThatEndpoint):
         )
 
 
-def _game_info_panel() -> Element:
-    return Element(
-        "section",
-        Element("h1", id="gi-title"),
-        Element("p", id="gi-author"),
-        Element("p", id="gi-description", class_="usertext"),
-        id="game-info",
-        class_="panel",
+# The panels are empty shells which the scripts fill in, so they are the
+# same on every page and only need rendering once.
+@functools.cache
+def _game_info_panel() -> RawHTML:
+    return RawHTML(
+        Element(
+            "section",
+            Element("h1", id="gi-title"),
+            Element("p", id="gi-author"),
+            Element("p", id="gi-description", class_="usertext"),
+            id="game-info",
+            class_="panel",
+        ).html,
     )
 
 
-def _play_area_panel(*, with_scores: bool) -> Element:
-    return Element(
-        "section",
+@functools.cache
+def _play_area_panel(*, with_scores: bool) -> RawHTML:
+    return RawHTML(
         Element(
-            "main",
-            Element("p", id="pl-headline"),
-            Element("p", id="pl-text", class_="usertext"),
-            Element("img", id="pl-media"),
-        ),
-        Element("div", id="scores") if with_scores else "",
-        id="play-area",
-        class_="panel",
+            "section",
+            Element(
+                "main",
+                Element("p", id="pl-headline"),
+                Element("p", id="pl-text", class_="usertext"),
+                Element("img", id="pl-media"),
+            ),
+            Element("div", id="scores") if with_scores else "",
+            id="play-area",
+            class_="panel",
+        ).html,
     )
@@ -6,7 +6,6 @@ from __future__ import annotations as _future_annotations
 
 from typing import TYPE_CHECKING
 
-import dataclasses
 import enum
 from uuid import uuid4
 
@@ -25,7 +24,6 @@ class Answer(enum.StrEnum):
     BOTH = "both"
 
 
-@dataclasses.dataclass
 class ThisOrThatQuestion:
     @classmethod
     def new(cls, engine: ThisOrThisEngine) -> ThisOrThatQuestion:
@@ -48,6 +46,16 @@ class ThisOrThatQuestion:
     answer_text: str | None
     answer_media: Blob | None
 
+    __slots__ = (
+        "uuid",
+        "question_text",
+        "question_media",
+        "is_this",
+        "is_that",
+        "answer_text",
+        "answer_media",
+    )
+
     def __init__(  # noqa: PLR0913 many valued data class
         self,
         engine: ThisOrThisEngine,
@@ -90,6 +98,9 @@ class ThisOrThatQuestion:
 
         return other.uuid == self.uuid
 
+    def __repr__(self) -> str:
+        return f"ThisOrThatQuestion<{self.uuid}>"
+
     def json(self) -> JSONDict:
         return {
             "uuid": self.uuid,
@@ -7,7 +7,10 @@ from __future__ import annotations as _future_annotations
 from types import TracebackType
 from typing import Any
 
+import copy
 import logging
+import logging.handlers
+import queue
 import traceback
 
 from pythonjsonlogger.jsonlogger import JsonFormatter as _JsonFormatter
@@ -76,4 +79,81 @@ class JsonFormatter(_JsonFormatter):
         }
 
 
-__all__ = "JsonFormatter", "JournalHandler"
+# Extras set by endpoints, which hold game objects rather than plain values.
+_ROOM_EXTRAS = ("room", "endpoint", "socket")
+
+
+class RoomQueueHandler(logging.handlers.QueueHandler):
+    room_code: str
+
+    def __init__(self, log_queue: queue.SimpleQueue[logging.LogRecord], room_code: str) -> None:
+        super().__init__(log_queue)
+        self.room_code = room_code
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the stock prepare(), this keeps the exception info, which
+        # the JSON formatter renders itself on the other side of the queue.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.room_code = self.room_code
+        # The live room, endpoint and socket objects are rendered here, on the
+        # loop thread, rather than by the listener when the record is written.
+        for key in _ROOM_EXTRAS:
+            value = getattr(record, key, None)
+            if value is not None:
+                setattr(record, key, str(value))
+        return record
+
+
+class RoomFileHandler(logging.Handler):
+    """
+    Writes records from RoomQueueHandlers to one file per room. This is run
+    by a QueueListener, so the files are opened and written off the loop.
+    """
+
+    _directory: str
+    _files: dict[str, logging.FileHandler]
+
+    def __init__(self, directory: str) -> None:
+        super().__init__()
+        self._directory = directory
+        self._files = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        room_code: str | None = getattr(record, "room_code", None)
+        if room_code is None:
+            return
+
+        if getattr(record, "room_closed", False):
+            if handler := self._files.pop(room_code, None):
+                handler.close()
+            return
+
+        handler = self._files.get(room_code)
+        if handler is None:
+            handler = logging.FileHandler(f"{self._directory}/{room_code}.log", encoding="utf-8")
+            handler.setFormatter(JsonFormatter())  # type: ignore[no-untyped-call]
+            self._files[room_code] = handler
+
+        handler.handle(record)
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        self._files.clear()
+        super().close()
+
+
+def room_closed_record(room_code: str) -> logging.LogRecord:
+    # Queued after a room's last record, so RoomFileHandler can close its file.
+    return logging.makeLogRecord({"room_code": room_code, "room_closed": True})
+
+
+__all__ = (
+    "JsonFormatter",
+    "JournalHandler",
+    "RoomQueueHandler",
+    "RoomFileHandler",
+    "room_closed_record",
+)
@@ -5,29 +5,38 @@
 from __future__ import annotations as _future_annotations
 
 from collections.abc import Awaitable, Callable, Mapping
-from typing import TYPE_CHECKING, ParamSpec
+from typing import TYPE_CHECKING, Any, NamedTuple, ParamSpec
 
 import abc
 import asyncio
-import dataclasses
+import contextlib
 import datetime
-import json
 import logging
-import uuid
+import secrets
+import time
 
+import orjson
 import yarl
-from aiohttp import http_websocket, web
+from aiohttp import WSMsgType, http_websocket, web
 
 from webapp import Request, ResponseProtocol
 
 if TYPE_CHECKING:
     from catbox.engine import JSONDict
     from catbox.site.state import CatBoxContext, Session
+    from catbox.user import User
 
 
 TIMEOUT = datetime.timedelta(minutes=15)
 TIMEZONE = datetime.UTC
 
+_TIMEOUT_SECONDS = TIMEOUT.total_seconds()
+
+# A client this many messages behind is disconnected rather than buffered for.
+_OUTBOX_LIMIT = 256
+# How long a finished socket has to send what is still queued for it.
+_FLUSH_SECONDS = 2.5
+
 
 P = ParamSpec("P")
 
@@ -48,22 +57,23 @@ def command_no_log(
     return func
 
 
-@dataclasses.dataclass
-class RoomOptions:
+class RoomOptions(NamedTuple):
     scoring: bool
-    teams: list[str]
+    teams: tuple[str, ...]
     audience: bool
 
 
 class Room(abc.ABC):
     endpoints: Mapping[str, Endpoint]
     logger: logging.Logger
+    on_stop: Callable[[], None] | None
     _stopped: bool
-    _ping: datetime.datetime
+    _deadline: float
 
     def __init__(self, logger: logging.Logger, **kwargs: Endpoint | None) -> None:
         self.endpoints = {k: v for k, v in kwargs.items() if v}
         self.logger = logger
+        self.on_stop = None
         self._stopped = False
         self.ping()
 
@@ -75,10 +85,16 @@ class Room(abc.ABC):
         if self._stopped:
             return
 
-        self._ping = datetime.datetime.now(TIMEZONE) + TIMEOUT
+        # This is called for every message, so only the deadline is updated.
+        # The reaper picks up the new value when the previous one comes due.
+        self._deadline = time.monotonic() + _TIMEOUT_SECONDS
+
+    @property
+    def deadline(self) -> float:
+        return self._deadline
 
     async def reap(self) -> bool:
-        if self._ping < datetime.datetime.now(TIMEZONE):
+        if self._deadline < time.monotonic():
             await self.stop()
 
         return self._stopped
@@ -89,6 +105,9 @@ class Room(abc.ABC):
         for e in self.endpoints.values():
             await e.stop()
 
+        if self.on_stop:
+            self.on_stop()
+
     @property
     @abc.abstractmethod
     def default_endpoint(self) -> Endpoint:
@@ -100,34 +119,116 @@ class Room(abc.ABC):
         pass
 
 
+class EndpointLogger(logging.LoggerAdapter):  # type: ignore[type-arg]
+    # The stock adapter replaces any per-call extra; merge it in instead.
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:  # noqa: ANN401 - Inherited
+        extra = kwargs.get("extra")
+        kwargs["extra"] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+
+def _dumps(data: Any) -> str:  # noqa: ANN401 - Any JSON value
+    # The standard json module turns non-string keys into strings; keep that.
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class Socket(web.WebSocketResponse):
     remote: str
     socket_id: str
     session: Session
 
+    _described_user: User | None
+    _repr: str
+    _str: str
+    # None marks the end of the queue; the sender closes the socket there.
+    _outbox: asyncio.Queue[str | None]
+    _closing: bool
+
     def __init__(self, session: Session, request: Request) -> None:
         super().__init__(receive_timeout=2.5, heartbeat=1)
 
         self.remote = (
             request.headers.get("x-forwarded-for") or request.remote or "[unknown endpoint]"
         )
-        self.socket_id = str(uuid.uuid4())
+        # Clients use the leading hex digits of the id as the editor colour.
+        self.socket_id = secrets.token_hex(4)
         self.session = session
+        self._outbox = asyncio.Queue(_OUTBOX_LIMIT)
+        self._closing = False
+        self._describe()
 
     @property
     def username(self) -> str:
         return self.session.user.user_name if self.session.user else self.session.cookie
 
+    def _describe(self) -> None:
+        # The session can be logged in part way through a socket's life,
+        # so the cached descriptions are tied to the user they were built for.
+        username = self.username
+        self._described_user = self.session.user
+        self._repr = f"Socket<user={username},remote={self.remote},socket_id={self.socket_id}>"
+        self._str = f"{username} @ {self.remote}/{self.socket_id}"
+
+    async def send_json(
+        self,
+        data: Any,  # noqa: ANN401 - Any JSON value
+        compress: int | None = None,
+        *,
+        dumps: Callable[[Any], str] = _dumps,
+    ) -> None:
+        await super().send_json(data, compress, dumps=dumps)
+
+    def queue_str(self, data: str) -> None:
+        if self._closing:
+            return
+
+        try:
+            self._outbox.put_nowait(data)
+        except asyncio.QueueFull:
+            self.queue_close()
+
+    def queue_close(self) -> None:
+        if self._closing:
+            return
+
+        self._closing = True
+        # A client that has fallen this far behind is dropped, along with
+        # its backlog, so that there is room for the end marker.
+        if self._outbox.full():
+            while not self._outbox.empty():
+                self._outbox.get_nowait()
+        self._outbox.put_nowait(None)
+
+    async def send_queued(self) -> None:
+        try:
+            while (data := await self._outbox.get()) is not None and not self.closed:
+                await self.send_str(data)
+        finally:
+            self._closing = True
+
+        await self.close()
+
     def __repr__(self) -> str:
-        return f"Socket<user={self.username},remote={self.remote},socket_id={self.socket_id[0:8]}>"
+        if self.session.user is not self._described_user:
+            self._describe()
+        return self._repr
 
     def __str__(self) -> str:
-        return f"{self.username} @ {self.remote}/{self.socket_id[0:4]}"
+        if self.session.user is not self._described_user:
+            self._describe()
+        return self._str
+
+
+RPCCommand = Callable[..., Awaitable["JSONDict | None"]]
 
 
 class Endpoint(abc.ABC):
+    # Command name to (function, whether to log each call).
+    _commands: dict[str, tuple[RPCCommand, bool]] = {}
+
     room: Room
     _stopped: bool
+    _log: EndpointLogger
 
     _room_code: str | None
     _endpoint: yarl.URL | None
@@ -135,12 +236,24 @@ class Endpoint(abc.ABC):
 
     def __init__(self, room: Room) -> None:
         self.room = room
+        self._log = EndpointLogger(room.logger, {"room": room, "endpoint": self})
 
         self._room_code = None
         self._endpoint = None
         self._sockets = set()
         self._stopped = False
 
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+
+        # Resolve the RPC commands once per class, so that dispatching a
+        # message is a single dict lookup rather than getattr + hasattr.
+        cls._commands = {
+            name: (func, func.__rpc_log__)
+            for name in dir(cls)
+            if getattr(func := getattr(cls, name, None), "__is_rpc__", False)
+        }
+
     @abc.abstractmethod
     def __str__(self) -> str:
         pass
@@ -155,53 +268,49 @@ class Endpoint(abc.ABC):
         *args: str,
         socket: Socket | None = None,
     ) -> None:
-        self.room.logger.error(
+        self._log.error(
             msg,
             *args,
             exc_info=ex,
-            extra={"room": self.room, "endpoint": self, "socket": socket},
+            extra={"socket": socket},
         )
 
     def _info(self, msg: str, *args: str, socket: Socket | None = None) -> None:
-        self.room.logger.info(
-            msg,
-            *args,
-            extra={"room": self.room, "endpoint": self, "socket": socket},
-        )
+        self._log.info(msg, *args, extra={"socket": socket})
 
     def _error(self, msg: str, *args: str, socket: Socket | None = None) -> None:
-        self.room.logger.error(
-            msg,
-            *args,
-            extra={"room": self.room, "endpoint": self, "socket": socket},
-        )
+        self._log.error(msg, *args, extra={"socket": socket})
 
-    async def _fanout(self, data: JSONDict, *, log: bool = True) -> list[Exception]:
-        exceptions = [
-            res
-            for res in await asyncio.gather(
-                *(socket.send_json(data) for socket in self._sockets),
-                return_exceptions=True,
-            )
-            if isinstance(res, Exception)
-        ]
-
-        if not log:
-            return exceptions
+    async def _fanout(self, data: JSONDict) -> None:
+        # Serialise once for every socket, rather than once per send_json call.
+        payload = _dumps(data)
 
-        for exc in exceptions:
-            self._exception(exc, "Error in fanout")
+        # Each socket's sender task writes the message out, so no task is
+        # created per message, and one slow client does not hold up the rest.
+        # Sockets which are already closing are left for their own handler
+        # to remove, rather than failing a send and being logged as errors.
+        for socket in self._sockets:
+            if not socket.closed:
+                socket.queue_str(payload)
 
-        return []
+    async def _send_queued(self, socket: Socket) -> None:
+        try:
+            await socket.send_queued()
+        except Exception as ex:  # noqa: BLE001 - Being passed to logger
+            # Nothing more can be sent, so stop queueing for this socket and
+            # close it, which also ends its message handler.
+            self._exception(ex, "Error sending to socket", socket=socket)
+            self._sockets.discard(socket)
+            with contextlib.suppress(Exception):
+                await socket.close()
 
     def on_register(self, room_code: str, endpoint: yarl.URL) -> None:
         self._room_code = room_code
         self._endpoint = endpoint
-        self.room.logger.info(
-            "Registered as %s",
-            room_code,
-            extra={"endpoint": self, "room": self.room},
-        )
+
+        # The room's logger is replaced with a per-room child when registered.
+        self._log = EndpointLogger(self.room.logger, {"room": self.room, "endpoint": self})
+        self._log.info("Registered as %s", room_code)
 
     @property
     def room_code(self) -> str | None:
@@ -219,8 +328,9 @@ class Endpoint(abc.ABC):
         sockets = self._sockets.copy()
         for socket in sockets:
             self._info("Closing socket due to stop request", socket=socket)
-            await socket.send_json({"cmd": "close"})
-            await socket.close()
+            # Sent (and the socket closed) after whatever is already queued.
+            socket.queue_str(_dumps({"cmd": "close"}))
+            socket.queue_close()
 
     async def __call__(self, ctx: CatBoxContext, request: Request) -> ResponseProtocol:
         if self._stopped:
@@ -230,12 +340,26 @@ class Endpoint(abc.ABC):
         self._info("Accepting new connection", socket=socket)
         await socket.prepare(request)
 
+        # The endpoint may have been stopped while the handshake was happening,
+        # in which case the socket missed being closed by stop().
+        if self._stopped:
+            await socket.close()
+            return socket  # type: ignore[return-value]
+
         self._sockets.add(socket)
         if task := asyncio.current_task():
             task.set_name(repr(socket))
 
-        # Process all messages in this socket
-        await self._process_messages(socket)
+        # Process all messages in this socket, with fanouts sent alongside.
+        sender = asyncio.create_task(self._send_queued(socket))
+        try:
+            await self._process_messages(socket)
+        finally:
+            # Give anything already queued a chance to go out before the
+            # sender is abandoned; wait_for cancels it if it takes too long.
+            socket.queue_close()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(sender, _FLUSH_SECONDS)
 
         self._sockets.discard(socket)
         self._info("Disconnecting %s", str(socket), socket=socket)
@@ -245,57 +369,64 @@ class Endpoint(abc.ABC):
 
     async def _process_messages(self, socket: Socket) -> None:
         message: http_websocket.WSMessage
+        # stop() closes every registered socket, which ends this iteration,
+        # so there is no need to check whether the endpoint is stopped here.
         async for message in socket:
-            # If the Room has closed, exit immediately.
-            if self._stopped:
-                await socket.close()
-                return
-
             # Mark the room as still active.
             self.room.ping()
             await self._parse_message(socket, message)
 
     async def _parse_message(self, socket: Socket, message: http_websocket.WSMessage) -> None:
-        # Decode the incoming request
+        if message.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+            self._error("Unexpected %s message", message.type.name, socket=socket)
+            return None
+
+        # Decode the incoming request; orjson takes the str or bytes payload as-is.
         try:
-            data = message.json()
-        except json.JSONDecodeError as ex:
+            data = orjson.loads(message.data)
+        except orjson.JSONDecodeError as ex:
             self._exception(ex, "Invalid JSON", socket=socket)
-            return await socket.send_json(
-                {
-                    "cmd": "error",
-                    "message": "Invalid JSON",
-                    "data": message.data,
-                    "exception": str(ex),
-                },
+            socket.queue_str(
+                _dumps(
+                    {
+                        "cmd": "error",
+                        "message": "Invalid JSON",
+                        "data": message.data if message.type is WSMsgType.TEXT else None,
+                        "exception": str(ex),
+                    },
+                ),
             )
+            return None
 
         # Extract the command name and underlying function
         cmd_name = data.get("cmd", "[NO COMMAND SPECIFIED]")
-        cmd = getattr(self, cmd_name, None)
+        entry = self._commands.get(cmd_name)
 
         # Check the requested command is an RPC command
-        if not cmd or not hasattr(cmd, "__is_rpc__"):
+        if not entry:
             self._error("Invalid command %s", cmd_name, socket=socket)
-            return await socket.send_json(
-                {"cmd": "error", "message": f"Invalid command {cmd_name}"},
-            )
+            socket.queue_str(_dumps({"cmd": "error", "message": f"Invalid command {cmd_name}"}))
+            return None
 
         # Remove the command name from the arguments
         del data["cmd"]
+        cmd, log = entry
 
         # Execute the command
         try:
-            if cmd.__rpc_log__:
+            if log:
                 self._info("Running command %s", cmd_name, socket=socket)
-            if resp := await cmd(socket, **data):
-                await socket.send_json(resp)
+            # Replies (and errors) are queued behind any fanout the command made.
+            if resp := await cmd(self, socket, **data):
+                socket.queue_str(_dumps(resp))
         except BaseException as ex:  # noqa: BLE001 - Being passed to logger
-            self._exception(ex, "Error processing command %s", cmd, socket=socket)
-            await socket.send_json(
-                {
-                    "cmd": "error",
-                    "message": "Invalid JSON",
-                    "exception": str(ex),
-                },
+            self._exception(ex, "Error processing command %s", cmd_name, socket=socket)
+            socket.queue_str(
+                _dumps(
+                    {
+                        "cmd": "error",
+                        "message": "Invalid JSON",
+                        "exception": str(ex),
+                    },
+                ),
             )
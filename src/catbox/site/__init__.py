@@ -10,11 +10,13 @@ import asyncio
 import ipaddress
 import json
 import pathlib
-import uuid
+import secrets
+import urllib.parse
 from http import HTTPStatus
 
-import multidict
+import orjson
 import yarl
+from aiohttp import ClientTimeout
 from aiohttp.web import HTTPFound, Response
 
 from catbox.engine import EpisodeState, EpisodeVersion, GameEngine
@@ -35,7 +37,18 @@ from .review_index import approved, review_index
 from .state import CatBoxContext, CatBoxRoute, CatBoxState, OAuthDetails, PublicEndpoint
 
 
+_RESOURCES_DIR = (pathlib.Path(__file__).parent / "resources").resolve()
+
+# Logins should fail quickly rather than hang if Twitch is unreachable.
+_TWITCH_TIMEOUT = ClientTimeout(total=15, connect=3)
+
+
 class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
+    _authorize_url_template: str
+    _login_redirect_uri: str
+
+    __slots__ = ("_authorize_url_template", "_login_redirect_uri")
+
     def __init__(  # noqa: PLR0913 all args important.
         self,
         loop: asyncio.AbstractEventLoop,
@@ -50,6 +63,27 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         super().__init__(CatBoxState(public, oauth, engines), not_found())
         self._binds.add((ipaddress.IPv4Address(listen.host), listen.port))
 
+        self._login_redirect_uri = str(self._app_context.make_url("/login"))
+
+        # Only the CSRF state changes between logins; it is a hex string,
+        # so it can be appended without any further quoting.
+        self._authorize_url_template = (
+            str(
+                yarl.URL.build(
+                    scheme="https",
+                    host="id.twitch.tv",
+                    path="/oauth2/authorize",
+                    query={
+                        "response_type": "code",
+                        "client_id": oauth.client_id,
+                        "redirect_uri": self._login_redirect_uri,
+                        "scope": "",
+                    },
+                ),
+            )
+            + "&state={}"
+        )
+
         routes = self.default_table()
 
         routes.add("/play/*", CatBoxRoute(self.play_episode))
@@ -68,12 +102,7 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         routes.add("/join", CatBoxRoute(self.join_by_query))
         routes.add("/ws/*", CatBoxRoute(self.endpoint))
         routes.add("/blob/*", CatBoxRoute(self.blob))
-        add_resources(
-            loop,
-            self._app_context,
-            routes,
-            (pathlib.Path(__file__) / ".." / "resources").resolve(),
-        )
+        add_resources(loop, self._app_context, routes, _RESOURCES_DIR)
         for ident, engine in engines.items():
             add_resources(loop, self._app_context, routes, engine.resources(), ident + "/")
 
@@ -104,28 +133,30 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         if not user or not user.is_mod:
             return HTTPUnauthorizedError(reason="This page is for moderators only.")
 
-        return DocResponse(await review_index(self._app_context.engines.values()))
+        return DocResponse(review_index(self._app_context.engines.values()))
 
     async def login(self, ctx: CatBoxContext, request: Request) -> ResponseProtocol:
         session = ctx.session
+        logger = self._app_context.logger
+        query = request.query
 
-        if "error" in request.query:
-            self._app_context.logger.warning(
+        if "error" in query:
+            logger.warning(
                 "Error in login response %s",
-                request.query["error_description"],
+                query["error_description"],
                 extra={"session": session},
             )
-            return HTTPUnauthorizedError(reason=request.query["error_description"])
+            return HTTPUnauthorizedError(reason=query["error_description"])
 
-        if "code" in request.query:
-            csrf_state = request.query["state"]
-            self._app_context.logger.info(
+        if "code" in query:
+            csrf_state = query["state"]
+            logger.info(
                 "Processing login",
                 extra={"session": session, "csrf_token": csrf_state},
             )
 
             if not csrf_state or (session.login_state != csrf_state):
-                self._app_context.logger.warning(
+                logger.warning(
                     "Bad CSRF token",
                     extra={
                         "session": session,
@@ -135,31 +166,18 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
                 )
                 return HTTPUnauthorizedError(reason="The CSRF token did not match")
 
-            if not (user := await self._get_user_from_twitch(request.query["code"])):
+            if not (user := await self._get_user_from_twitch(query["code"])):
                 return HTTPUnauthorizedError(reason="Error getting info from Twitch")
 
             session.user = user
             return HTTPFound(session.redirect_to or "/")
 
-        session.login_state = uuid.uuid4().hex
-        session.redirect_to = request.query.get("to", "/")
-
-        url = yarl.URL.build(
-            scheme="https",
-            host="id.twitch.tv",
-            path="/oauth2/authorize",
-            query={
-                "response_type": "code",
-                "client_id": self._app_context.oauth.client_id,
-                "redirect_uri": str(self._app_context.make_url("/login")),
-                "scope": "",
-                "state": session.login_state,
-            },
-        )
+        session.login_state = secrets.token_hex(16)
+        session.redirect_to = query.get("to", "/")
 
-        resp = HTTPFound(location=url)
+        resp = HTTPFound(location=self._authorize_url_template.format(session.login_state))
 
-        self._app_context.logger.info(
+        logger.info(
             "Starting login flow",
             extra={"session": session, "csrf_token": session.login_state},
         )
@@ -170,7 +188,7 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         if not ctx.user:
             return send_to_login(request)
 
-        return DocResponse(await cms_index(self._app_context.engines.values(), ctx.user))
+        return cms_index(self._app_context.engines.values(), ctx.user)
 
     async def blob(self, _: CatBoxContext, request: Request) -> ResponseProtocol:
         if not self._app_context.blob_manager:
@@ -179,8 +197,10 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         return await self._app_context.blob_manager.handle(request)
 
     async def play_episode(self, ctx: CatBoxContext, request: Request) -> ResponseProtocol:
-        if request.path == "/play":
-            return DocResponse(await game_index(self._app_context.engines.values()))
+        app = self._app_context
+
+        if not request.path_args:
+            return game_index(app.engines.values())
 
         data = self._get_owned_episode(ctx, request)
 
@@ -192,7 +212,7 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
 
         engine, episode = data
         room = engine.play_episode(episode, await process_options(engine, request))
-        self._app_context.add_room(room)
+        app.add_room(room)
 
         return HTTPFound(f"/room/{room.starting_endpoint.room_code}")
 
@@ -212,9 +232,8 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         if not ctx.user:
             return send_to_login(request)
 
-        _, _, _, engine_ident = request.path.split("/", 3)
-
-        engine = self._app_context.engines[engine_ident]
+        engine_ident = "/".join(request.path_args)
+        engine = self._app_context.engines.get(engine_ident)
 
         if not engine or not engine.cms_enabled:
             return HTTPNotFoundError(
@@ -304,16 +323,20 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         if (require_owner or require_moderator) and not ctx.user:
             return send_to_login(request)
 
-        _, _, engine_ident, episode_id, version_str = request.path.split("/", 5)
+        try:
+            engine_ident, episode_id_str, version_str = request.path_args
+            episode_id, version = int(episode_id_str), int(version_str)
+        except ValueError:
+            return HTTPNotFoundError(reason="Episode not found")
 
-        engine = self._app_context.engines[engine_ident]
+        engine = self._app_context.engines.get(engine_ident)
 
         if not engine or not engine.cms_enabled:
             return HTTPNotFoundError(
                 reason=f"Engine {engine_ident} does not exist or does not support CMS editing.",
             )
 
-        episode = engine.get_episode_version(int(episode_id), int(version_str))
+        episode = engine.get_episode_version(episode_id, version)
 
         if not episode:
             return HTTPNotFoundError(reason="Episode not found")
@@ -331,7 +354,7 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         return engine, episode
 
     async def join(self, ctx: CatBoxContext, request: Request) -> ResponseProtocol:
-        _, _, room_code = request.path.split("/", 2)
+        room_code = "/".join(request.path_args)
         endpoint = self._app_context.active_endpoints.get(room_code)
 
         if request.method == "PATCH":
@@ -350,7 +373,7 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         return HTTPFound("/room/" + request.query.get("room", "0000").upper())
 
     async def endpoint(self, ctx: CatBoxContext, request: Request) -> ResponseProtocol:
-        _, _, room_code = request.path.split("/", 2)
+        room_code = "/".join(request.path_args)
 
         if not (endpoint := self._app_context.active_endpoints.get(room_code.upper())):
             return HTTPNotFoundError()
@@ -358,60 +381,63 @@ class CatBoxApplication(Application[CatBoxState, CatBoxContext, CatBoxRoute]):
         return await endpoint(ctx, request)
 
     async def _get_user_from_twitch(self, authorization_code: str) -> User | None:
-        if not self._app_context.http:
+        app = self._app_context
+        http, oauth, user_manager = app.http, app.oauth, app.user_manager
+
+        if not http:
             raise RuntimeError
-        if not self._app_context.user_manager:
+        if not user_manager:
             raise RuntimeError
 
-        resp = await self._app_context.http.post(
+        resp = await http.post(
             "https://id.twitch.tv/oauth2/token",
             data={
-                "client_id": self._app_context.oauth.client_id,
-                "client_secret": self._app_context.oauth.client_secret,
+                "client_id": oauth.client_id,
+                "client_secret": oauth.client_secret,
                 "grant_type": "authorization_code",
                 "code": authorization_code,
-                "redirect_uri": str(self._app_context.make_url("/login")),
+                "redirect_uri": self._login_redirect_uri,
             },
-            timeout=15,
+            timeout=_TWITCH_TIMEOUT,
         )
 
         if resp.status != HTTPStatus.OK:
             message = await resp.text()
-            self._app_context.logger.error(
+            app.logger.error(
                 "Error fetching oAuth token: %s",
                 message,
                 extra={"status_code": resp.status},
             )
             raise HTTPUnauthorizedError(reason=message)
 
-        token = (await resp.json()).get("access_token")
+        token = (await resp.json(loads=orjson.loads)).get("access_token")
 
-        resp = await self._app_context.http.get(
+        resp = await http.get(
             "https://api.twitch.tv/helix/users",
             headers={
-                "Authorization": "Bearer " + token,
-                "Client-ID": self._app_context.oauth.client_id,
+                "Authorization": f"Bearer {token}",
+                "Client-ID": oauth.client_id,
             },
-            timeout=15,
+            timeout=_TWITCH_TIMEOUT,
         )
 
         if resp.status != HTTPStatus.OK:
             message = await resp.text()
-            self._app_context.logger.error(
+            app.logger.error(
                 "Error getting Twitch user details: %s",
                 message,
                 extra={"status_code": resp.status},
             )
             raise HTTPUnauthorizedError(reason=message)
 
-        user_list = (await resp.json()).get("data", [])
+        user_list = (await resp.json(loads=orjson.loads)).get("data", [])
 
         if not user_list:
             raise HTTPUnauthorizedError(reason="No user returned?")
 
         user = user_list[0]
 
-        return self._app_context.user_manager.for_twitch(int(user["id"]), user["display_name"])
+        return user_manager.for_twitch(int(user["id"]), user["display_name"])
 
 
 def add_resources(
@@ -421,11 +447,13 @@ def add_resources(
     path: pathlib.Path,
     prefix: str = "/",
 ) -> None:
+    add = router.add
+
     for file in path.iterdir():
-        router.add(prefix + file.name, static(loop, context, file))
+        add(prefix + file.name, static(loop, context, file))
 
         if file.name == "index.html":
-            router.add(prefix, static(loop, context, file))
+            add(prefix, static(loop, context, file))
 
 
 def static(
@@ -444,12 +472,7 @@ def not_found() -> CatBoxRoute:
 
 
 def send_to_login(request: Request) -> HTTPFound:
-    return HTTPFound(
-        yarl.URL.build(
-            path="/login",
-            query=multidict.MultiDict({"to": str(request.url.relative())}),
-        ),
-    )
+    return HTTPFound("/login?to=" + urllib.parse.quote(str(request.rel_url), safe=""))
 
 
 __all__ = ["CatBoxApplication", "CatBoxState", "OAuthDetails", "PublicEndpoint"]
@@ -6,30 +6,59 @@ from __future__ import annotations as _future_annotations
 
 from collections.abc import Iterable
 
-import asyncio
+import html
+
+import lru
 
 from catbox.engine import EpisodeMeta, EpisodeState, EpisodeVersion
 from catbox.engine.engine import GameEngine
+from catbox.static import StreamedDocResponse
 from catbox.user import User
-from dom import Document, Element
+from dom import Document, Element, Node, RawHTML, TextNode
 
+# Rendered engine sections, keyed by engine ident and user id, along with
+# the engine revision they were built from.
+_engine_index_cache: lru.LRU[tuple[str, int], tuple[int, RawHTML]] = lru.LRU(1024)
 
-async def cms_index(engines: Iterable[GameEngine[EpisodeVersion]], user: User) -> Document:
-    available: list[BaseException | Element] = await asyncio.gather(
-        *(engine_index(engine, user) for engine in engines if engine.cms_enabled),
-        return_exceptions=True,
-    )
-    title = f"CatBox Games - {user.user_name}'s Episodes"
 
-    return Document(
+def cms_index(
+    engines: Iterable[GameEngine[EpisodeVersion]],
+    user: User,
+) -> StreamedDocResponse:
+    title = f"CatBox Games - {user.user_name}'s Episodes"
+    document = Document(
         title,
         Element("header", Element("a", Element("h1", "🏠 ", title), href="/"), class_="left-slant"),
-        *[v.html if isinstance(v, Element) else str(v) for v in available],
         styles=["/defs.css", "/style.css"],
     )
 
+    return StreamedDocResponse(
+        document,
+        (_safe_engine_index(engine, user) for engine in engines if engine.cms_enabled),
+    )
+
+
+def _safe_engine_index(engine: GameEngine[EpisodeVersion], user: User) -> Node:
+    # One broken engine should not take out the whole page.
+    try:
+        return engine_index(engine, user)
+    except Exception as ex:  # noqa: BLE001 - Rendered in place of the engine
+        return TextNode(str(ex))
+
+
+def engine_index(engine: GameEngine[EpisodeVersion], user: User) -> RawHTML:
+    key = (engine.ident, user.user_id)
+    revision = engine.revision
+    cached = _engine_index_cache.get(key)
+    if cached and cached[0] == revision:
+        return cached[1]
 
-async def engine_index(engine: GameEngine[EpisodeVersion], user: User) -> Element:
+    section = RawHTML(_engine_index(engine, user).html)
+    _engine_index_cache[key] = (revision, section)
+    return section
+
+
+def _engine_index(engine: GameEngine[EpisodeVersion], user: User) -> Element:
     return Element(
         "section",
         Element(
@@ -153,31 +182,32 @@ def episode_panel(episode: EpisodeMeta) -> Element:
 
     if episode:
         panel.children.append(
-            Element(
-                "details",
-                Element("summary", "All Versions"),
-                *(
-                    Element(
-                        "p",
-                        "Version ",
-                        str(version),
-                        ": ",
-                        status,
-                        ", updated ",
-                        updated.isoformat(),
-                        version_link("view", episode, version),
-                        (
-                            version_link("discard", episode, version)
-                            if status != EpisodeState.DISCARDED
-                            else ""
-                        ),
-                    )
-                    for version, (status, updated) in episode
-                ),
-            ),
+            Element("details", Element("summary", "All Versions"), version_rows(episode)),
         )
 
     return panel
 
 
+def version_rows(episode: EpisodeMeta) -> RawHTML:
+    # Episodes can build up a lot of versions, so this block is rendered
+    # straight to a string rather than as half a dozen Elements per row.
+    path = html.escape(f"{episode.engine_ident}/{episode.id}")
+    parts: list[str] = []
+
+    for version, (status, updated) in episode:
+        parts.append(
+            f"<p>Version {version}: {status}, updated {updated.isoformat()}"
+            f'<a href="/view/{path}/{version}" class="button" title="View version {version}">'
+            "View</a>",
+        )
+        if status != EpisodeState.DISCARDED:
+            parts.append(
+                f'<a href="/discard/{path}/{version}" class="button"'
+                f' title="Discard version {version}">Discard</a>',
+            )
+        parts.append("</p>")
+
+    return RawHTML("".join(parts))
+
+
 __all__ = ["cms_index"]
@@ -26,26 +26,29 @@ class HTTPUnauthorizedError(DocResponse, Exception):
         )
 
 
+# The page furniture is the same for every error; the elements are never
+# modified after construction, so they can be shared between documents.
+_STYLES = ["/defs.css", "/style.css"]
+_HEADER = Element(
+    "header",
+    Element("a", Element("h1", "🏠 CatBox Games"), href="/"),
+    class_="left-slant",
+)
+_NAV = Element(
+    "article",
+    Element(
+        "ul",
+        Element("li", Element("a", "CatBox Home", href="/")),
+        Element("li", Element("a", "Content Management Home", href="/cms")),
+    ),
+    class_="panel",
+)
+
+
 def doc(*body: str) -> Document:
     return Document(
         "CatBox - Error",
-        Element(
-            "header",
-            Element("a", Element("h1", "🏠 CatBox Games"), href="/"),
-            class_="left-slant",
-        ),
-        Element(
-            "main",
-            Element("article", *body, class_="panel"),
-            Element(
-                "article",
-                Element(
-                    "ul",
-                    Element("li", Element("a", "CatBox Home", href="/")),
-                    Element("li", Element("a", "Content Management Home", href="/cms")),
-                ),
-                class_="panel",
-            ),
-        ),
-        styles=["/defs.css", "/style.css"],
+        _HEADER,
+        Element("main", Element("article", *body, class_="panel"), _NAV),
+        styles=_STYLES,
     )
@@ -6,44 +6,59 @@ from __future__ import annotations as _future_annotations
 
 from collections.abc import Iterable
 
-import asyncio
-
 from catbox.engine import EpisodeState, EpisodeVersion
 from catbox.engine.engine import GameEngine, OptionSupport
-from dom import Document, Element
-
-
-async def game_index(engines: Iterable[GameEngine[EpisodeVersion]]) -> Document:
-    available = await asyncio.gather(*(engine_index(engine) for engine in engines))
-
-    return Document(
+from catbox.static import StreamedDocResponse
+from dom import Document, Element, RawHTML
+
+_SCORING_RULES = {
+    OptionSupport.NOT_SUPPORTED: "no teams, no scoring",
+    OptionSupport.REQUIRED: "1-{max_teams} teams",
+    OptionSupport.OPTIONAL: "optional scoring for 1-{max_teams} teams",
+}
+_AUDIENCE_RULES = {
+    OptionSupport.NOT_SUPPORTED: "",
+    OptionSupport.REQUIRED: ", with audience",
+    OptionSupport.OPTIONAL: ", with optional audience",
+}
+
+# Rendered engine sections, keyed by engine ident, along with the engine
+# revision they were built from. They are kept as markup, so that a cache hit
+# does not walk the element tree again.
+_engine_index_cache: dict[str, tuple[int, RawHTML]] = {}
+
+
+def game_index(engines: Iterable[GameEngine[EpisodeVersion]]) -> StreamedDocResponse:
+    document = Document(
         "CatBox Games",
         Element(
             "header",
             Element("a", Element("h1", "🏠 CatBox Games"), href="/"),
             class_="left-slant",
         ),
-        *available,
         styles=["/defs.css", "/style.css"],
     )
 
+    return StreamedDocResponse(document, (engine_index(engine) for engine in engines))
+
 
-async def engine_index(engine: GameEngine[EpisodeVersion]) -> Element:
-    rule_summary = "Game rules: "
+def engine_index(engine: GameEngine[EpisodeVersion]) -> RawHTML:
+    revision = engine.revision
+    cached = _engine_index_cache.get(engine.ident)
+    if cached and cached[0] == revision:
+        return cached[1]
 
-    match engine.scoring_mode:
-        case OptionSupport.NOT_SUPPORTED:
-            rule_summary += "no teams, no scoring"
-        case OptionSupport.REQUIRED:
-            rule_summary += f"1-{engine.max_teams} teams"
-        case OptionSupport.OPTIONAL:
-            rule_summary += f"optional scoring for 1-{engine.max_teams} teams"
+    section = RawHTML(_engine_index(engine).html)
+    _engine_index_cache[engine.ident] = (revision, section)
+    return section
 
-    match engine.supports_audience:
-        case OptionSupport.REQUIRED:
-            rule_summary += ", with audience"
-        case OptionSupport.OPTIONAL:
-            rule_summary += ", with optional audience"
+
+def _engine_index(engine: GameEngine[EpisodeVersion]) -> Element:
+    rule_summary = (
+        "Game rules: "
+        + _SCORING_RULES[engine.scoring_mode].format(max_teams=engine.max_teams)
+        + _AUDIENCE_RULES[engine.supports_audience]
+    )
 
     return Element(
         "section",
@@ -62,7 +77,13 @@ async def engine_index(engine: GameEngine[EpisodeVersion]) -> Element:
     )
 
 
+def button(text: str, href: str) -> Element:
+    return Element("a", text, href=href, class_="button")
+
+
 def episode_panel(episode: EpisodeVersion) -> Element:
+    path = f"{episode.engine_ident}/{episode.id}/{episode.version}"
+
     return Element(
         "article",
         Element("h3", episode.title),
@@ -70,18 +91,8 @@ def episode_panel(episode: EpisodeVersion) -> Element:
         Element("p", episode.full_description, class_="usertext"),
         Element(
             "p",
-            Element(
-                "a",
-                "Play",
-                href=f"/play/{episode.engine_ident}/{episode.id}/{episode.version}",
-                class_="button",
-            ),
-            Element(
-                "a",
-                "Audit Content",
-                href=f"/view/{episode.engine_ident}/{episode.id}/{episode.version}",
-                class_="button",
-            ),
+            button("Play", "/play/" + path),
+            button("Audit Content", "/view/" + path),
         ),
         class_="panel gl-game-panel",
     )
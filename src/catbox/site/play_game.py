@@ -4,10 +4,12 @@
 
 from __future__ import annotations as _future_annotations
 
+import functools
+
 from catbox.engine import EpisodeState, EpisodeVersion, GameEngine, OptionSupport
 from catbox.room import RoomOptions
 from catbox.static import DocResponse
-from dom import Document, Element, Node, NodeList
+from dom import Document, Element, Node, NodeList, RawHTML
 from webapp import Request, ResponseProtocol
 
 
@@ -65,23 +67,7 @@ def setup_page(engine: GameEngine[EpisodeVersion], episode: EpisodeVersion) -> R
                         episode.full_description,
                         class_="panel usertext",
                     ),
-                    Element(
-                        "article",
-                        Element(
-                            "form",
-                            Element("h2", "Game Options"),
-                            _scoring_box(engine),
-                            _audience_box(engine),
-                            Element(
-                                "input",
-                                type="submit",
-                                value="Play",
-                                class_="button button-large",
-                            ),
-                            method="POST",
-                        ),
-                        class_="panel",
-                    ),
+                    _options_panel(engine),
                 ),
                 class_="gl-game-list",
             ),
@@ -90,8 +76,52 @@ def setup_page(engine: GameEngine[EpisodeVersion], episode: EpisodeVersion) -> R
     )
 
 
-def _scoring_box(engine: GameEngine[EpisodeVersion]) -> Node:
-    if engine.scoring_mode == OptionSupport.NOT_SUPPORTED:
+def _options_panel(engine: GameEngine[EpisodeVersion]) -> Node:
+    return _options_panel_for(engine.scoring_mode, engine.max_teams, engine.supports_audience)
+
+
+# The options form is the bulk of the page, and is the same for every episode
+# of an engine, so it is kept as pre-rendered markup.
+@functools.lru_cache(maxsize=16)
+def _options_panel_for(
+    scoring_mode: OptionSupport,
+    max_teams: int,
+    supports_audience: OptionSupport,
+) -> Node:
+    return RawHTML(
+        Element(
+            "article",
+            Element(
+                "form",
+                Element("h2", "Game Options"),
+                _scoring_box_for(scoring_mode, max_teams),
+                _audience_box_for(supports_audience),
+                Element(
+                    "input",
+                    type="submit",
+                    value="Play",
+                    class_="button button-large",
+                ),
+                method="POST",
+            ),
+            class_="panel",
+        ).html,
+    )
+
+
+_SCORING_SCRIPT = Element(
+    "script",
+    "const tog = document.getElementById('scoring');"
+    "const target = document.getElementById('teams');"
+    "tog.addEventListener('change',()=>target.toggleAttribute('disabled',!tog.checked));",
+)
+
+
+# The option boxes only depend on the engine's settings, of which there are
+# only a handful of combinations, and rendering never modifies the nodes.
+@functools.lru_cache(maxsize=16)
+def _scoring_box_for(scoring_mode: OptionSupport, max_teams: int) -> Node:
+    if scoring_mode == OptionSupport.NOT_SUPPORTED:
         return Element("ul", Element("li", "Scoring + Teams are not supported."))
 
     return NodeList(
@@ -107,9 +137,7 @@ def _scoring_box(engine: GameEngine[EpisodeVersion]) -> Node:
                         id="scoring",
                         name="scoring",
                         checked="checked",
-                        disabled=(
-                            "disabled" if engine.scoring_mode == OptionSupport.REQUIRED else None
-                        ),
+                        disabled=("disabled" if scoring_mode == OptionSupport.REQUIRED else None),
                     ),
                     "Enable Scoring",
                 ),
@@ -123,21 +151,17 @@ def _scoring_box(engine: GameEngine[EpisodeVersion]) -> Node:
                     Element("input", type="text", id=f"team-{i}", name="team"),
                     for_=f"team-{i}",
                 )
-                for i in range(engine.max_teams)
+                for i in range(max_teams)
             ),
             id="teams",
         ),
-        Element(
-            "script",
-            "const tog = document.getElementById('scoring');"
-            "const target = document.getElementById('teams');"
-            "tog.addEventListener('change',()=>target.toggleAttribute('disabled',!tog.checked));",
-        ),
+        _SCORING_SCRIPT,
     )
 
 
-def _audience_box(engine: GameEngine[EpisodeVersion]) -> Node:
-    if engine.supports_audience == OptionSupport.NOT_SUPPORTED:
+@functools.lru_cache(maxsize=4)
+def _audience_box_for(supports_audience: OptionSupport) -> Node:
+    if supports_audience == OptionSupport.NOT_SUPPORTED:
         return Element("ul", Element("li", "Audience/Chat is not supported."))
 
     return Element(
@@ -160,22 +184,23 @@ async def process_options(engine: GameEngine[EpisodeVersion], request: Request)
     elif engine.scoring_mode == OptionSupport.NOT_SUPPORTED:
         scoring = False
     else:
-        scoring = post_data.get("scoring", None) == "on"
+        scoring = post_data.get("scoring") == "on"
 
     if engine.supports_audience == OptionSupport.REQUIRED:
         audience = True
     elif engine.supports_audience == OptionSupport.NOT_SUPPORTED:
         audience = False
     else:
-        audience = post_data.get("audience", None) == "on"
+        audience = post_data.get("audience") == "on"
 
     if scoring:
-        raw_teams = post_data.getall("team", [])
-        teams = [str(name) for name in raw_teams if name]
+        # Form fields are already strings; anything else is a stray file upload.
+        raw_teams = post_data.getall("team", ())
+        teams = tuple(name for name in raw_teams if name and isinstance(name, str))
         if not teams:
-            teams = ["Players"]
+            teams = ("Players",)
     else:
-        teams = []
+        teams = ()
 
     return RoomOptions(
         scoring=scoring,
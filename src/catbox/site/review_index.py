@@ -6,15 +6,18 @@ from __future__ import annotations as _future_annotations
 
 from collections.abc import Iterable
 
-import asyncio
-
 from catbox.engine import EpisodeMeta, EpisodeState, EpisodeVersion
 from catbox.engine.engine import GameEngine
-from dom import Document, Element
+from catbox.site.game_index import button
+from dom import Document, Element, RawHTML
+
+# Rendered review panels, keyed by the episode version and the version that is
+# currently published (which is the only part of the panel from the metadata).
+_panel_cache: dict[tuple[str, int, int, int | None], RawHTML] = {}
 
 
-async def review_index(engines: Iterable[GameEngine[EpisodeVersion]]) -> Document:
-    available = await asyncio.gather(*(engine_index(engine) for engine in engines))
+def review_index(engines: Iterable[GameEngine[EpisodeVersion]]) -> Document:
+    available = [engine_index(engine) for engine in engines]
 
     if not any(bool(block) for block in available):
         available = [
@@ -37,11 +40,23 @@ async def review_index(engines: Iterable[GameEngine[EpisodeVersion]]) -> Documen
     )
 
 
-async def engine_index(engine: GameEngine[EpisodeVersion]) -> Element | str:
-    panels = [
-        panel(episode, engine.get_episode_meta(episode.id))
-        for episode in engine.list_episodes(EpisodeState.PENDING_REVIEW)
-    ]
+def engine_index(engine: GameEngine[EpisodeVersion]) -> Element | str:
+    keys: set[tuple[str, int, int, int | None]] = set()
+    panels: list[RawHTML] = []
+
+    for episode in engine.list_episodes(EpisodeState.PENDING_REVIEW):
+        meta = engine.get_episode_meta(episode.id)
+        published = meta.version(EpisodeState.PUBLISHED) if meta else None
+        key = (episode.engine_ident, episode.id, episode.version, published)
+        keys.add(key)
+
+        if (cached := _panel_cache.get(key)) is None:
+            cached = _panel_cache[key] = RawHTML(panel(episode, meta).html)
+        panels.append(cached)
+
+    # Drop panels for this engine's episodes that are no longer pending review.
+    for key in [k for k in _panel_cache if k[0] == engine.ident and k not in keys]:
+        del _panel_cache[key]
 
     if not panels:
         return ""
@@ -60,6 +75,7 @@ async def engine_index(engine: GameEngine[EpisodeVersion]) -> Element | str:
 
 
 def panel(episode: EpisodeVersion, meta: EpisodeMeta | None) -> Element:
+    path = f"{episode.engine_ident}/{episode.id}/{episode.version}"
     published = "Unknown"
     if meta:
         published = str(meta.version(EpisodeState.PUBLISHED))
@@ -72,24 +88,9 @@ def panel(episode: EpisodeVersion, meta: EpisodeMeta | None) -> Element:
         Element("p", episode.full_description, class_="usertext"),
         Element(
             "p",
-            Element(
-                "a",
-                "Audit Content",
-                href=f"/view/{episode.engine_ident}/{episode.id}/{episode.version}",
-                class_="button",
-            ),
-            Element(
-                "a",
-                "Approve",
-                class_="button",
-                href=f"/approve/{episode.engine_ident}/{episode.id}/{episode.version}",
-            ),
-            Element(
-                "a",
-                "Reject",
-                class_="button",
-                href=f"/reject/{episode.engine_ident}/{episode.id}/{episode.version}",
-            ),
+            button("Audit Content", "/view/" + path),
+            button("Approve", "/approve/" + path),
+            button("Reject", "/reject/" + path),
         ),
         class_="panel gl-game-panel",
     )
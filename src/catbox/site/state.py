@@ -7,21 +7,26 @@ from __future__ import annotations as _future_annotations
 from typing import Any
 
 import asyncio
+import contextlib
 import dataclasses
+import functools
+import heapq
 import logging
+import logging.handlers
 import os
-import random
+import queue
+import secrets
 import sqlite3
 import string
-import uuid
+import time
 
 import aiohttp
 import yarl
 from aiohttp.web import StreamResponse
 
 from catbox.blob import BlobManager
-from catbox.engine import GameEngine
-from catbox.logger import JsonFormatter
+from catbox.engine import EpisodeState, GameEngine
+from catbox.logger import RoomFileHandler, RoomQueueHandler, room_closed_record
 from catbox.room import Endpoint, Room
 from catbox.user import User, UserManager
 from webapp import AppContext, Handler, Request, RequestContext, ResponseProtocol, Route
@@ -29,6 +34,13 @@ from webapp import AppContext, Handler, Request, RequestContext, ResponseProtoco
 DEFAULT_HTTPS_PORT = 443
 SESSION_COOKIE = "_cookie"
 
+# How long the reaper sleeps for when there are no rooms at all.
+_REAP_IDLE_SECONDS = 30.0
+
+# Maps each random byte to a letter. 256 is not a multiple of 26, so the
+# letters are very slightly uneven, which does not matter for room codes.
+_ROOM_CODE_TABLE = (string.ascii_uppercase * 10)[:256].encode("ascii")
+
 
 @dataclasses.dataclass
 class Session:
@@ -63,6 +75,8 @@ class CatBoxContext(RequestContext):
 
 
 class CatBoxRoute(Route[CatBoxContext]):
+    __slots__ = ()
+
     def __init__(self, handler: Handler[CatBoxContext]) -> None:
         async def inner(a: CatBoxContext, r: Request) -> ResponseProtocol:
             resp = await handler(a, r)
@@ -93,6 +107,8 @@ class OAuthDetails:
 class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
     url: PublicEndpoint
     oauth: OAuthDetails
+    _websocket_origin: yarl.URL
+    _http_origin: yarl.URL
 
     engine_types: dict[str, type[GameEngine[Any]]]
     engines: dict[str, GameEngine[Any]]
@@ -104,6 +120,10 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
     sessions: dict[str, Session]
     active_rooms: dict[str, Room]
     active_endpoints: dict[str, Endpoint]
+    reap_queue: list[tuple[float, str]]
+    room_log_queue: queue.SimpleQueue[logging.LogRecord]
+    _room_log_listener: logging.handlers.QueueListener
+    _reap_wakeup: asyncio.Event
     tasks: set[asyncio.Task[None]]
 
     def __init__(
@@ -115,6 +135,16 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         super().__init__(logging.getLogger("catbox"))
         self.url = endpoint
         self.oauth = oauth
+        self._websocket_origin = yarl.URL.build(
+            scheme="wss" if endpoint.port == DEFAULT_HTTPS_PORT else "ws",
+            host=endpoint.host,
+            port=endpoint.port,
+        )
+        self._http_origin = yarl.URL.build(
+            scheme="https" if endpoint.port == DEFAULT_HTTPS_PORT else "http",
+            host=endpoint.host,
+            port=endpoint.port,
+        )
         self.engine_types = engines.copy()
         self.engines = {}
         self.blob_manager = None
@@ -124,13 +154,30 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         self.sessions = {}
         self.active_rooms = {}
         self.active_endpoints = {}
+        self.reap_queue = []
+        self.room_log_queue = queue.SimpleQueue()
+        self._room_log_listener = logging.handlers.QueueListener(
+            self.room_log_queue,
+            RoomFileHandler("logs"),
+        )
+        self._reap_wakeup = asyncio.Event()
         self.tasks = set()
 
     async def start(self) -> None:
         loop = asyncio.get_running_loop()
 
+        self._room_log_listener.start()
+
         self.logger.info("Connecting to database.")
         self.database = sqlite3.connect("games.db")
+        self.database.execute("PRAGMA journal_mode=WAL")
+        self.database.execute("PRAGMA synchronous=NORMAL")
+        self.database.execute("PRAGMA busy_timeout=5000")
+        self.database.execute("PRAGMA temp_store=MEMORY")
+        self.database.execute("PRAGMA mmap_size=268435456")
+        self.database.execute("PRAGMA cache_size=-64000")
+        # Added after the first databases were made, so not in all of them.
+        self.database.execute("CREATE INDEX IF NOT EXISTS engine ON Episode (game_engine)")
         self.blob_manager = BlobManager(loop, self.database)
         self.user_manager = UserManager(self.database)
         self.http = aiohttp.ClientSession(loop=loop)
@@ -146,6 +193,9 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
             )
             for ident, engine in self.engine_types.items()
         }
+        # Load the published listings now, rather than on the first index request.
+        for engine in self.engines.values():
+            engine.list_episodes(EpisodeState.PUBLISHED)
         self.tasks.add(loop.create_task(self.reap_rooms(), name="reap-rooms"))
 
     def _kitteh_login(self, user_manager: UserManager) -> None:
@@ -157,13 +207,36 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         kitteh.user = user_manager.get(1)
         self.sessions[session] = kitteh
 
+    def _queue_reap(self, code: str, deadline: float) -> None:
+        heapq.heappush(self.reap_queue, (deadline, code))
+
+        # Wake the reaper if this is now the next room due.
+        if self.reap_queue[0][1] == code:
+            self._reap_wakeup.set()
+
     async def reap_rooms(self) -> None:
+        # Rooms are queued by deadline, and the reaper sleeps until the first
+        # one is due (or an earlier one is queued). A room that has been
+        # pinged since it was queued is re-queued at its new deadline; stale
+        # entries for rooms that have already gone are dropped.
+        pending = self.reap_queue
+
         try:
             while True:
-                await asyncio.sleep(2)
-                for code in list(self.active_rooms.keys()):
+                timeout = pending[0][0] - time.monotonic() if pending else _REAP_IDLE_SECONDS
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._reap_wakeup.wait(), max(timeout, 0))
+                self._reap_wakeup.clear()
+                now = time.monotonic()
+
+                while pending and pending[0][0] < now:
+                    _, code = heapq.heappop(pending)
                     room = self.active_rooms.get(code)
-                    if not room or not await room.reap():
+                    if not room:
+                        continue
+
+                    if not await room.reap():
+                        self._queue_reap(code, room.deadline)
                         continue
 
                     del self.active_rooms[code]
@@ -176,6 +249,7 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
                         del self.active_endpoints[endpoint]
 
                     self.logger.info("Reaped room %s (endpoints %s)", code, endpoints)
+                    self.room_log_queue.put_nowait(room_closed_record(code))
         except asyncio.CancelledError:
             pass
 
@@ -197,6 +271,11 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         self.active_rooms = {}
         self.active_endpoints = {}
 
+        self.logger.warning("Closing room logs")
+        self._room_log_listener.stop()
+        for handler in self._room_log_listener.handlers:
+            handler.close()
+
         self.logger.warning("Closing database connection")
         if self.database:
             self.database.commit()
@@ -215,15 +294,23 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
             await self.http.close()
 
     async def make_context(self, _: CatBoxRoute, request: Request) -> CatBoxContext:
-        cookie = request.cookies.get(SESSION_COOKIE, uuid.uuid4().hex)
-        session = self.sessions.setdefault(cookie, Session(cookie))
+        # Only mint a cookie (and session) when the request doesn't match one.
+        cookie = request.cookies.get(SESSION_COOKIE)
+        if cookie is None:
+            cookie = secrets.token_hex(16)
+
+        session = self.sessions.get(cookie)
+        if session is None:
+            session = self.sessions[cookie] = Session(cookie)
 
         return CatBoxContext(self, session)
 
     def _generate_room_code(self) -> str:
-        code = "".join(random.choices(string.ascii_uppercase, k=4))  # noqa: S311 - Not crypto
+        # Room codes grant access to their endpoint (including the GM view), so
+        # they come from the OS rather than the shared, predictable game RNG.
+        code = secrets.token_bytes(4).translate(_ROOM_CODE_TABLE).decode("ascii")
         while code in self.active_endpoints:
-            code = "".join(random.choices(string.ascii_uppercase, k=4))  # noqa: S311 - Not crypto
+            code = secrets.token_bytes(4).translate(_ROOM_CODE_TABLE).decode("ascii")
         return code
 
     def add_task(self, task: asyncio.Task[None]) -> None:
@@ -238,12 +325,15 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         self.active_rooms[room_code] = room
         self.active_endpoints[room_code] = endpoint
 
-        handler = logging.FileHandler(f"logs/{room_code}.log", encoding="utf-8")
-        handler.setFormatter(JsonFormatter())  # type: ignore[no-untyped-call]
+        # The room's log file is written by the listener thread.
+        handler = RoomQueueHandler(self.room_log_queue, room_code)
         handler.setLevel(logging.INFO)
         room.logger = room.logger.getChild(room_code)
         room.logger.addHandler(handler)
 
+        self._queue_reap(room_code, room.deadline)
+        room.on_stop = functools.partial(self._queue_reap, room_code, 0.0)
+
         endpoint.on_register(room_code, self.websocket(room_code))
 
         for endpoint in room.endpoints.values():
@@ -257,17 +347,7 @@ class CatBoxState(AppContext[CatBoxRoute, CatBoxContext]):  # Big data class.
         return room.starting_endpoint
 
     def websocket(self, room: str) -> yarl.URL:
-        return yarl.URL.build(
-            scheme="wss" if self.url.port == DEFAULT_HTTPS_PORT else "ws",
-            host=self.url.host,
-            port=self.url.port,
-            path="/ws/" + room,
-        )
+        return self._websocket_origin.with_path("/ws/" + room)
 
     def make_url(self, path: str) -> yarl.URL:
-        return yarl.URL.build(
-            scheme="https" if self.url.port == DEFAULT_HTTPS_PORT else "http",
-            host=self.url.host,
-            port=self.url.port,
-            path=path,
-        )
+        return self._http_origin.with_path(path)
@@ -4,19 +4,24 @@
 
 from __future__ import annotations as _future_annotations
 
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 import asyncio
+import contextlib
+import functools
 import gzip
 import hashlib
 import mimetypes
 import os
 import pathlib
 import re
+from http import HTTPStatus
 
 import aiohttp.web
 import asyncinotify
 import brotli  # type: ignore[import-untyped]
+import lru
 import multidict
 import rcssmin  # type: ignore[import-untyped]
 import rjsmin  # type: ignore[import-untyped]
@@ -27,8 +32,15 @@ from webapp import ResponseProtocol
 if TYPE_CHECKING:
     from catbox.site.state import CatBoxContext, CatBoxState, PublicEndpoint
 
-_PRELOAD_REGEXP = re.compile(r'<link rel="preload" href="(.+)" as="(.+)">')
+_PRELOAD_REGEXP = re.compile(rb'<link rel="preload" href="([^"]+)" as="([^"]+)">')
 _DEFAULT_HTTPS_PORT = 443
+_WATCH_SETTLE_SECONDS = 0.05
+_SENDFILE_MIN_SIZE = 4096
+
+# The encoded bodies of recently sent documents. Pages like the index are
+# identical for many requests in a row; per-user pages just fall out of the
+# small cache. str caches its own hash, so a hit costs one string compare.
+_encoded_docs: lru.LRU[str, EncodedDoc] = lru.LRU(64)
 
 
 def enable_optimisation(public: PublicEndpoint) -> None:
@@ -41,12 +53,20 @@ def enable_optimisation(public: PublicEndpoint) -> None:
 
 
 class Content:
-    headers: multidict.CIMultiDict[str]
+    headers: multidict.CIMultiDictProxy[str]
     content: bytes
+    # Set when the body is sent straight from disk instead of from content.
+    file: pathlib.Path | None
 
-    def __init__(self, headers: dict[str, str], content: bytes) -> None:
-        self.headers = multidict.CIMultiDict(headers)
+    def __init__(
+        self,
+        headers: dict[str, str],
+        content: bytes,
+        file: pathlib.Path | None = None,
+    ) -> None:
+        self.headers = multidict.CIMultiDictProxy(multidict.CIMultiDict(headers))
         self.content = content
+        self.file = file
 
 
 class StaticResponse:
@@ -56,7 +76,8 @@ class StaticResponse:
     _task: asyncio.Future[None]
     _watcher: asyncio.Task[None]
     _tag: str | None
-    _versions: dict[str, Content]
+    # Encoded versions of the file, in order of preference.
+    _versions: tuple[tuple[str, Content], ...]
     _headers: multidict.CIMultiDict[str]
 
     def __init__(
@@ -68,7 +89,7 @@ class StaticResponse:
         mime: str | None = None,
     ) -> None:
         self._tag = None
-        self._versions = {}
+        self._versions = ()
         self._task = loop.run_in_executor(None, self._init_info, file, mime)
 
         if not self.ENABLE_OPTIMISATION:
@@ -82,7 +103,12 @@ class StaticResponse:
         with file.open("rb") as in_stream:
             content = in_stream.read()
 
-        self._tag = self._tag or hashlib.sha1(content, usedforsecurity=False).hexdigest()
+        # Editors can modify a file without changing it; skip the rebuild.
+        tag = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if tag == self._tag and self._versions:
+            return
+
+        self._tag = tag
         base_headers = {
             "Content-Type": mime,
             "Cache-Control": (
@@ -111,19 +137,31 @@ class StaticResponse:
                 "gzip": gzip.compress(content),
                 "": content,
             }
+        elif len(content) >= _SENDFILE_MIN_SIZE:
+            # Media is served unmodified, so there is no need to keep a copy
+            # of it in memory when it can be sent from the file.
+            headers = {"Content-Encoding": "", "Content-Length": str(len(content))}
+            headers.update(base_headers)
+            self._versions = (("", Content(headers, b"", file)),)
+            return
 
+        versions = []
         for mode, data in options.items():
             headers = {"Content-Encoding": mode, "Content-Length": str(len(data))}
             headers.update(base_headers)
-            self._versions[mode] = Content(headers, data)
+            versions.append((mode, Content(headers, data)))
+
+        # Replaced in one go, so prepare() never sees a half-built set.
+        self._versions = tuple(versions)
 
     def extract_preloads(self, content: bytes) -> list[str]:
         preloads = []
-        for preload in _PRELOAD_REGEXP.finditer(content.decode("utf-8")):
-            href = preload.group(1)
+        for preload in _PRELOAD_REGEXP.finditer(content):
+            href = preload.group(1).decode("utf-8")
             if not href.startswith("http"):
                 href = self.PUBLIC_URL + href.removeprefix("/")
-            preloads.append(f"<{href}>; rel=preload; as={preload.group(2)}; crossorigin")
+            as_type = preload.group(2).decode("utf-8")
+            preloads.append(f"<{href}>; rel=preload; as={as_type}; crossorigin")
         return preloads
 
     async def _watch(
@@ -136,8 +174,28 @@ class StaticResponse:
         inotify.add_watch(file, asyncinotify.Mask.MODIFY)
 
         try:
+            # Make sure the first load has finished before any reload starts.
+            # If it failed (say, the file was mid-write), the reloads below
+            # are still wanted to recover it.
+            with contextlib.suppress(OSError):
+                await self._task
+
             async for _ in inotify:
-                loop.run_in_executor(None, self._init_info, file, mime)
+                # A single save often produces a burst of events; wait for it
+                # to settle and reload once.
+                with contextlib.suppress(asyncio.TimeoutError):
+                    while True:
+                        await asyncio.wait_for(inotify.get(), _WATCH_SETTLE_SECONDS)
+
+                # Reloads are awaited so that only one runs at a time; events
+                # that arrive meanwhile are picked up on the next pass. A file
+                # caught mid-write is retried on its next modification.
+                with contextlib.suppress(OSError):
+                    await loop.run_in_executor(None, self._init_info, file, mime)
+                    # Replace a failed first load, which prepare() awaits.
+                    if self._task.exception() is not None:
+                        self._task = loop.create_future()
+                        self._task.set_result(None)
         except asyncio.CancelledError:
             return
 
@@ -153,17 +211,46 @@ class StaticResponse:
             await writer.write_eof()
             return
 
-        accept_encoding = request.headers.get("Accept-Encoding", "")
+        accepted = _accepted_encodings(request)
 
-        for encoding, content in self._versions.items():
-            if encoding not in accept_encoding:
+        for encoding, content in self._versions:
+            # The identity version (no encoding) is always acceptable.
+            if encoding and encoding not in accepted:
                 continue
 
+            if content.file:
+                await self._send_file(request, content.file, content.headers)
+                return
+
             await writer.write_headers(
                 _http_status_line(request, 200, "Ok"),
                 content.headers,
             )
             await writer.write_eof(content.content)
+            return
+
+    @staticmethod
+    async def _send_file(
+        request: aiohttp.web.Request,
+        file: pathlib.Path,
+        headers: multidict.CIMultiDictProxy[str],
+    ) -> None:
+        writer = request.writer
+        transport = request.transport
+        if not transport:
+            await writer.write_eof()
+            return
+
+        with file.open("rb") as fobj:
+            # The file can change after it was loaded, so the length sent is
+            # that of the file being read, as in ImmutableFileResponse.
+            size = os.fstat(fobj.fileno()).st_size
+            send_headers = multidict.CIMultiDict(headers)
+            send_headers["Content-Length"] = str(size)
+
+            await writer.write_headers(_http_status_line(request, 200, "Ok"), send_headers)
+            await asyncio.get_running_loop().sendfile(transport, fobj, 0, size)
+        await writer.write_eof()
 
     async def write_eof(self, data: bytes = b"") -> None:
         pass
@@ -188,6 +275,8 @@ class ImmutableFileResponse:
     _file: pathlib.Path
     _etag: str
     _mime: str
+    # Built from the first successful open; the file's content never changes.
+    _headers: multidict.CIMultiDictProxy[str] | None
 
     def __init__(
         self,
@@ -200,6 +289,7 @@ class ImmutableFileResponse:
         self._file = file
         self._etag = tag
         self._mime = mime or mimetypes.guess_type(str(file))[0] or "text/plain"
+        self._headers = None
 
     async def prepare(self, request: aiohttp.web.Request) -> None:
         writer = request.writer
@@ -212,31 +302,37 @@ class ImmutableFileResponse:
             await writer.write_eof()
             return
 
-        if not self._file.exists():
-            await writer.write_headers(
-                _http_status_line(request, 404, "Not Found"),
-                multidict.CIMultiDict(),
-            )
-            await writer.write_eof()
-            return
-
         transport = request.transport
         if not transport:
             await writer.write_eof()
             return
 
-        with self._file.open("rb") as fobj:
-            headers = {
-                "Content-Type": self._mime,
-                "Content-Length": str(os.fstat(fobj.fileno()).st_size),
-                "Cache-Control": "public, max-age=10368000, stale-if-error=10368000, immutable",
-                "ETag": self._etag,
-            }
-
+        try:
+            fobj = self._file.open("rb")
+        except FileNotFoundError:
             await writer.write_headers(
-                _http_status_line(request, 200, "Ok"),
-                multidict.CIMultiDict(headers),
+                _http_status_line(request, 404, "Not Found"),
+                multidict.CIMultiDict(),
             )
+            await writer.write_eof()
+            return
+
+        with fobj:
+            if self._headers is None:
+                self._headers = multidict.CIMultiDictProxy(
+                    multidict.CIMultiDict(
+                        {
+                            "Content-Type": self._mime,
+                            "Content-Length": str(os.fstat(fobj.fileno()).st_size),
+                            "Cache-Control": (
+                                "public, max-age=10368000, stale-if-error=10368000, immutable"
+                            ),
+                            "ETag": self._etag,
+                        },
+                    ),
+                )
+
+            await writer.write_headers(_http_status_line(request, 200, "Ok"), self._headers)
             await self._loop.sendfile(transport, fobj)
         await writer.write_eof()
 
@@ -259,26 +355,41 @@ class DocResponse:
         self._doc = document
         self._status = status
 
-    async def prepare(self, request: aiohttp.web.Request) -> None:
-        writer = request.writer
-
-        content = self._doc.html.encode("utf-8")
-
+    def _headers(self) -> dict[str, str]:
         headers = {
             "Content-Type": "text/html; charset=utf-8",
             "Cache-Control": "must-revalidate, no-cache, no-store, private",
         }
 
         if StaticResponse.ENABLE_OPTIMISATION:
-            headers["Link"] = ", ".join(
-                ["<https://fonts.gstatic.com>; rel=preconnect"]
-                + [_preload_string(style, "style") for style in self._doc.styles]
-                + [_preload_string(script, "script") for script in self._doc.scripts],
-            )
+            headers["Link"] = _link_header(tuple(self._doc.styles), tuple(self._doc.scripts))
 
-        accept_encoding = request.headers.get("Accept-Encoding", "")
-        if "br" in accept_encoding:
-            content = brotli.compress(content)
+        return headers
+
+    async def prepare(self, request: aiohttp.web.Request) -> None:
+        writer = request.writer
+
+        encoded = _encode_doc(self._doc.html)
+        etag = encoded.etag
+        content = encoded.content
+        headers = self._headers()
+
+        # Pages carry per-session content, so they stay no-store; the ETag
+        # only lets a client that does revalidate skip the body.
+        if self._status == HTTPStatus.OK:
+            headers["ETag"] = etag
+
+            if_none_match = request.headers.get("if-none-match", "")
+            if etag in (tag.strip() for tag in if_none_match.split(",")):
+                await writer.write_headers(
+                    _http_status_line(request, 304, "Not Modified"),
+                    multidict.CIMultiDict({"ETag": etag}),
+                )
+                await writer.write_eof()
+                return
+
+        if "br" in _accepted_encodings(request):
+            content = encoded.compressed
             headers["Content-Encoding"] = "br"
 
         headers["Content-Length"] = str(len(content))
@@ -300,10 +411,113 @@ class DocResponse:
         pass
 
 
+class StreamedDocResponse(DocResponse):
+    """
+    Sends the document's own children, and then each of the sections as
+    they are produced, so the start of the page goes out before the later
+    sections have been built.
+    """
+
+    _sections: Iterable[dom.Node]
+
+    def __init__(
+        self,
+        document: dom.Document,
+        sections: Iterable[dom.Node],
+        status: int = 200,
+    ) -> None:
+        super().__init__(document, status)
+        self._sections = sections
+
+    async def prepare(self, request: aiohttp.web.Request) -> None:
+        # Chunked encoding is needed to stream with keep-alive.
+        if request.version < aiohttp.HttpVersion11:
+            self._doc.children.extend(self._sections)
+            await super().prepare(request)
+            return
+
+        writer = request.writer
+        headers = self._headers()
+        headers["Transfer-Encoding"] = "chunked"
+
+        compressor = None
+        if "br" in _accepted_encodings(request):
+            compressor = brotli.Compressor()
+            headers["Content-Encoding"] = "br"
+
+        writer.enable_chunking()
+        await writer.write_headers(
+            _http_status_line(request, self._status, ""),
+            multidict.CIMultiDict(headers),
+        )
+
+        async def send(fragment: str) -> None:
+            data = fragment.encode("utf-8")
+            if compressor:
+                data = compressor.process(data) + compressor.flush()
+            await writer.write(data)
+
+        opening = [self._doc.opening_html]
+        for child in self._doc.children:
+            child.write(opening)
+        await send("".join(opening))
+        for section in self._sections:
+            await send(section.html)
+        await send(self._doc.closing_html)
+
+        if compressor:
+            await writer.write(compressor.finish())
+        await writer.write_eof()
+
+
 def _http_status_line(request: aiohttp.web.Request, status: int, message: str) -> str:
     return f"HTTP/{request.version.major}.{request.version.minor} {status} {message}"
 
 
+class EncodedDoc:
+    content: bytes
+    etag: str
+    _compressed: bytes | None
+
+    __slots__ = ("content", "etag", "_compressed")
+
+    def __init__(self, html: str) -> None:
+        self.content = html.encode("utf-8")
+        self.etag = f'W/"{hashlib.blake2b(self.content, digest_size=8).hexdigest()}"'
+        self._compressed = None
+
+    @property
+    def compressed(self) -> bytes:
+        # Only compressed once a client that accepts brotli asks for it.
+        if self._compressed is None:
+            self._compressed = brotli.compress(self.content)
+        return self._compressed
+
+
+def _encode_doc(html: str) -> EncodedDoc:
+    encoded = _encoded_docs.get(html)
+    if encoded is None:
+        encoded = _encoded_docs[html] = EncodedDoc(html)
+    return encoded
+
+
+def _accepted_encodings(request: aiohttp.web.Request) -> set[str]:
+    # Quality values are ignored; no client sends q=0 for br or gzip.
+    header = request.headers.get("Accept-Encoding", "")
+    return {token.split(";", 1)[0].strip().lower() for token in header.split(",")}
+
+
+# Pages share a handful of style and script sets, and PUBLIC_URL is fixed
+# before the first request, so the header is built once per set.
+@functools.lru_cache(maxsize=64)
+def _link_header(styles: tuple[str, ...], scripts: tuple[str, ...]) -> str:
+    return ", ".join(
+        ["<https://fonts.gstatic.com>; rel=preconnect"]
+        + [_preload_string(style, "style") for style in styles]
+        + [_preload_string(script, "script") for script in scripts],
+    )
+
+
 def _preload_string(href: str, as_type: str) -> str:
     if not href.startswith("http"):
         href = StaticResponse.PUBLIC_URL + href.removeprefix("/")
@@ -12,6 +12,21 @@ import sqlite3
 
 import lru
 
+# The sqlite3 module caches compiled statements per connection, keyed by the
+# SQL text; keeping each query in one place means every call site hits it.
+_SQL_USER_BY_ID = "SELECT user_id, user_name, twitch_id, is_mod FROM User WHERE user_id = ?"
+_SQL_USER_BY_TWITCH_ID = (
+    "SELECT user_id, user_name, twitch_id, is_mod FROM User WHERE twitch_id = ?"
+)
+_SQL_CREATE_USER = "INSERT INTO User (twitch_id, user_name) VALUES (?, ?)"
+_SQL_NOTIFICATIONS = (
+    "SELECT created_at, is_read, data FROM Notification"
+    " WHERE user_id = ? ORDER BY created_at DESC"
+)
+_SQL_UNREAD_COUNT = "SELECT COUNT(0) FROM Notification WHERE user_id = ? AND is_read = 0"
+_SQL_SEND_NOTIFICATION = "INSERT INTO Notification (user_id, data) VALUES (?, ?)"
+_SQL_MARK_READ = "UPDATE Notification SET is_read = 1 WHERE user_id = ?"
+
 
 @dataclasses.dataclass
 class User:
@@ -58,36 +73,67 @@ class Notification:
         }
 
 
+class _UserCache:
+    """
+    A 2Q cache. New entries wait in a small probation queue, and only move to
+    the main LRU when they are asked for again, so a pass over many users who
+    are only seen once does not push out the ones in regular use.
+    """
+
+    _probation: lru.LRU[int, User]
+    _main: lru.LRU[int, User]
+
+    def __init__(self, size: int) -> None:
+        probation_size = max(size // 4, 1)
+        self._probation = lru.LRU(probation_size)
+        self._main = lru.LRU(max(size - probation_size, 1))
+
+    def get(self, user_id: int) -> User | None:
+        if (user := self._main.get(user_id)) is not None:
+            return user
+
+        if (user := self._probation.pop(user_id, None)) is not None:
+            self._main[user_id] = user
+
+        return user
+
+    def put(self, user_id: int, user: User) -> None:
+        self._probation[user_id] = user
+
+
 class UserManager:
     _db: sqlite3.Connection
+    # Reads each get a fresh cursor from the connection; this one is kept
+    # for writes, which need lastrowid.
     _cursor: sqlite3.Cursor
-    _cache: lru.LRU[int, User]
+    _cache: _UserCache
+    # Notifications are only written through this class, so the counts are
+    # dropped whenever one is sent or read rather than expiring.
+    _unread_counts: lru.LRU[int, int]
 
     def __init__(self, db: sqlite3.Connection) -> None:
         self._db = db
         self._cursor = self._db.cursor()
-        self._cursor.row_factory = sqlite3.Row  # type: ignore[assignment]
-        self._cache = lru.LRU(1024)
+        self._cache = _UserCache(1024)
+        self._unread_counts = lru.LRU(1024)
 
     def get(self, user_id: int) -> User | None:
-        if user_id not in self._cache:
-            self._cursor.execute("SELECT * FROM User WHERE user_id = ?", (user_id,))
+        if (user := self._cache.get(user_id)) is not None:
+            return user
 
-            if not (row := self._cursor.fetchone()):
-                return None
+        if not (row := self._db.execute(_SQL_USER_BY_ID, (user_id,)).fetchone()):
+            return None
 
-            self._cache[user_id] = User(self, **row)
-
-        return self._cache[user_id]
+        user = User(self, *row)
+        self._cache.put(user_id, user)
+        return user
 
     def for_twitch(self, twitch_id: int, display_name: str) -> User | None:
-        self._cursor.execute("SELECT * FROM User WHERE twitch_id = ?", (twitch_id,))
-
-        if row := self._cursor.fetchone():
-            return User(**row)
+        if row := self._db.execute(_SQL_USER_BY_TWITCH_ID, (twitch_id,)).fetchone():
+            return User(self, *row)
 
         self._cursor.execute(
-            "INSERT INTO User (twitch_id, user_name) VALUES (?, ?)",
+            _SQL_CREATE_USER,
             (twitch_id, display_name),
         )
 
@@ -97,32 +143,37 @@ class UserManager:
         return self.get(user_id)
 
     def notifications(self, user: User) -> Iterator[Notification]:
-        self._cursor.execute("SELECT * FROM Notification WHERE user_id = ?", (user.user_id,))
+        rows = self._db.execute(_SQL_NOTIFICATIONS, (user.user_id,)).fetchall()
 
-        for row in self._cursor.fetchall():
+        # The full list gives the unread count for free.
+        self._unread_counts[user.user_id] = sum(1 for row in rows if not row[1])
+
+        for created_at, is_read, data in rows:
             yield Notification(
                 user,
-                datetime.datetime.fromisoformat(row["created_at"]),
-                bool(row["is_read"]),
-                row["data"],
+                datetime.datetime.fromisoformat(created_at),
+                bool(is_read),
+                data,
             )
 
     def unread_notification_count(self, user_id: int) -> int:
-        self._cursor.execute(
-            "SELECT COUNT(0) FROM Notification WHERE user_id = ? AND is_read = 0",
-            (user_id,),
-        )
+        if (count := self._unread_counts.get(user_id)) is not None:
+            return count
 
-        return int(self._cursor.fetchone()[0])
+        row = self._db.execute(_SQL_UNREAD_COUNT, (user_id,)).fetchone()
+        count = self._unread_counts[user_id] = int(row[0])
+        return count
 
     def send_notification(self, user_id: int, message: str) -> None:
         self._cursor.execute(
-            "INSERT INTO Notification (user_id, data) VALUES (?, ?)",
+            _SQL_SEND_NOTIFICATION,
             (user_id, message),
         )
+        self._unread_counts.pop(user_id, None)
 
     def mark_notifications_as_read(self, user_id: int) -> None:
         self._cursor.execute(
-            "UPDATE Notification SET is_read = 1 WHERE user_id = ?",
+            _SQL_MARK_READ,
             (user_id,),
         )
+        self._unread_counts.pop(user_id, None)
@@ -5,27 +5,46 @@
 from __future__ import annotations as _future_annotations
 
 import abc
+import functools
+import html
 
 
 class Node(abc.ABC):
+    __slots__ = ()
+
     @property
     @abc.abstractmethod
     def html(self) -> str:
         pass
 
+    def write(self, buf: list[str]) -> None:
+        """
+        Appends this node's markup to buf. Containers pass the same list down
+        to their children, so a whole tree is joined once at the top.
+        """
+        buf.append(self.html)
+
     def __str__(self) -> str:
-        return self.__str__()
+        return self.html
 
 
 class NodeList(Node):  # pylint: disable=too-few-public-methods
     nodes: tuple[Node, ...]
 
+    __slots__ = ("nodes",)
+
     def __init__(self, *nodes: Node) -> None:
         self.nodes = nodes
 
     @property
     def html(self) -> str:
-        return "".join(node.html for node in self.nodes)
+        buf: list[str] = []
+        self.write(buf)
+        return "".join(buf)
+
+    def write(self, buf: list[str]) -> None:
+        for node in self.nodes:
+            node.write(buf)
 
 
 class TextNode(Node, str):
@@ -36,27 +55,50 @@ class TextNode(Node, str):
         return self
 
 
+class RawHTML(Node, str):
+    """
+    Pre-rendered markup, inserted into the document verbatim.
+    """
+
+    __slots__ = ()
+
+    @property
+    def html(self) -> str:
+        return self
+
+
 class Element(Node):  # pylint: disable=too-few-public-methods
     element: str
     attributes: dict[str, str | None]
     children: list[Node]
 
+    __slots__ = ("element", "attributes", "children")
+
     def __init__(self, element: str, *children: Node | str, **attributes: str | None) -> None:
         self.element = element
-        self.attributes = attributes
+        # Trailing underscores allow reserved words (class_, for_) as keywords.
+        self.attributes = {key.strip("_"): value for key, value in attributes.items()}
         self.children = [x if isinstance(x, Node) else TextNode(x) for x in children]
 
     @property
     def html(self) -> str:
-        attributes = (
-            f' {key.strip("_")}="{value}"' for key, value in self.attributes.items() if value
-        )
+        buf: list[str] = []
+        self.write(buf)
+        return "".join(buf)
 
-        return (
-            f"<{self.element}{''.join(attributes)}>"
-            f"{''.join(x.html for x in self.children)}"
-            f"</{self.element}>"
-        )
+    def write(self, buf: list[str]) -> None:
+        append = buf.append
+
+        append("<" + self.element)
+        for key, value in self.attributes.items():
+            if value:
+                append(f' {key}="{html.escape(str(value))}"')
+        append(">")
+
+        for child in self.children:
+            child.write(buf)
+
+        append(f"</{self.element}>")
 
 
 class Document(Node):  # pylint: disable=too-few-public-methods
@@ -66,6 +108,8 @@ class Document(Node):  # pylint: disable=too-few-public-methods
     children: list[Node]
     attributes: dict[str, str]
 
+    __slots__ = ("title", "styles", "scripts", "children", "attributes")
+
     def __init__(
         self,
         title: str,
@@ -82,19 +126,48 @@ class Document(Node):  # pylint: disable=too-few-public-methods
 
     @property
     def html(self) -> str:
-        attributes = [f' {key.strip("_")}="{value}"' for key, value in self.attributes.items()]
-        styles = "".join(f'<link rel="stylesheet" href="{style}">' for style in self.styles)
-        scripts = "".join(
-            f'<script type="module" async defer src="{script}"></script>' for script in self.scripts
-        )
-        content = "".join(x.html for x in self.children)
-
-        return (
-            "<!DOCTYPE html>"
-            '<html lang="en">'
-            f'<head><meta charset="utf-8">'
-            '<meta name="viewport" content="width=device-width, initial-scale=1">'
-            f"<title>{self.title}</title>{styles}{scripts}</head>"
-            f"<body{''.join(attributes)}>{content}</body>"
-            "</html>"
+        buf: list[str] = []
+        self.write(buf)
+        return "".join(buf)
+
+    def write(self, buf: list[str]) -> None:
+        buf.append(self.opening_html)
+        for child in self.children:
+            child.write(buf)
+        buf.append(self.closing_html)
+
+    @property
+    def opening_html(self) -> str:
+        """
+        Everything up to and including the opening body tag.
+        """
+        attributes = "".join(
+            f' {key}="{html.escape(str(value))}"' for key, value in self.attributes.items()
         )
+        head = _head_links(tuple(self.styles), tuple(self.scripts))
+
+        return f"{_DOC_PREFIX}{html.escape(self.title)}</title>{head}</head><body{attributes}>"
+
+    @property
+    def closing_html(self) -> str:
+        return _DOC_SUFFIX
+
+
+# Everything up to the title is the same for every page.
+_DOC_PREFIX = (
+    "<!DOCTYPE html>"
+    '<html lang="en">'
+    '<head><meta charset="utf-8">'
+    '<meta name="viewport" content="width=device-width, initial-scale=1">'
+    "<title>"
+)
+_DOC_SUFFIX = "</body></html>"
+
+
+# Pages are built from a small number of style and script sets, so the
+# tags for each set are only rendered once.
+@functools.lru_cache(maxsize=64)
+def _head_links(styles: tuple[str, ...], scripts: tuple[str, ...]) -> str:
+    return "".join(f'<link rel="stylesheet" href="{style}">' for style in styles) + "".join(
+        f'<script type="module" async defer src="{script}"></script>' for script in scripts
+    )
@@ -21,6 +21,11 @@ import aiohttp.web
 
 
 class Request(aiohttp.web.BaseRequest):
+    ATTRS = aiohttp.web.BaseRequest.ATTRS | frozenset(["path_args"])
+
+    # Path segments after the matched prefix, for "/*" routes.
+    path_args: tuple[str, ...]
+
     def __init__(  # noqa: PLR0913 need 6 parameters for the super call.
         self,
         message: aiohttp.http.RawRequestMessage,
@@ -38,6 +43,7 @@ class Request(aiohttp.web.BaseRequest):
             task,
             task.get_loop(),
         )
+        self.path_args = ()
 
 
 class RequestContext:
@@ -121,20 +127,37 @@ AppCtx = TypeVar("AppCtx", bound=AppContext)  # type: ignore[type-arg]
 
 Bind = tuple[ipaddress.IPv4Address | ipaddress.IPv6Address | None, int] | pathlib.Path
 
+# Requests are not yet told which bind they arrived on; routed as this one.
+_EMPTY_PATH: Bind = pathlib.Path()
+
+
+# The same bodies the stock HTTPNotFound / HTTPInternalServerError would build.
+_NOT_FOUND_BODY = b"404: Not Found"
+_SERVER_ERROR_BODY = b"500: Internal Server Error"
+
 
 async def default_not_found(_c: RequestContext, _r: Request) -> aiohttp.web.Response:
-    return aiohttp.web.HTTPNotFound()
+    return aiohttp.web.Response(status=404, body=_NOT_FOUND_BODY, content_type="text/plain")
 
 
 DEFAULT_NOT_FOUND = Route(default_not_found)
 
 
+class PrefixNode(Generic[AppRoute]):
+    # One level of a prefix route trie, keyed by path segment.
+    route: AppRoute | None
+    children: dict[str, PrefixNode[AppRoute]]
+
+    __slots__ = ("route", "children")
+
+    def __init__(self) -> None:
+        self.route = None
+        self.children = {}
+
+
 class Router(Generic[AppCtx, RequestCtx, AppRoute]):
     _full_routes: dict[tuple[Bind | None, str | None], dict[str, AppRoute]]
-    _prefix_routes: dict[
-        tuple[Bind | None, str | None],
-        dict[tuple[str, ...], AppRoute],
-    ]
+    _prefix_routes: dict[tuple[Bind | None, str | None], PrefixNode[AppRoute]]
 
     def __init__(self, not_found_route: AppRoute) -> None:
         self._full_routes = {}
@@ -164,36 +187,54 @@ class Router(Generic[AppCtx, RequestCtx, AppRoute]):
         group = (bind, vhost)
         if group not in self._full_routes:
             self._full_routes[group] = {}
-            self._prefix_routes[group] = {}
+            self._prefix_routes[group] = PrefixNode()
 
         if path.endswith("/*"):
-            segments = (seg for seg in path.strip("/*").split("/") if seg)
-            self._prefix_routes[group][tuple(segments)] = route
+            node = self._prefix_routes[group]
+            for segment in (seg for seg in path.strip("/*").split("/") if seg):
+                node = node.children.setdefault(segment, PrefixNode())
+            node.route = route
         else:
             self._full_routes[group][path.strip("/")] = route
 
         return self
 
-    def route(self, bind: Bind, vhost: str, path: str) -> AppRoute:
-        groups = tuple(
-            g for g in ((bind, vhost), (bind, None), (None, None)) if g in self._full_routes
-        )
+    def route(self, bind: Bind, vhost: str, path: str) -> tuple[AppRoute, tuple[str, ...]]:
+        """
+        Find the route for a path, along with the path segments that follow
+        the matched prefix (which is always empty for full routes).
+        """
+        full_routes = self._full_routes
+        prefix_routes = self._prefix_routes
+        groups = [g for g in ((bind, vhost), (bind, None), (None, None)) if g in full_routes]
         path = path.strip("/")
 
-        for group in groups:
-            if handler := self._full_routes[group].get(path):
-                return handler
+        for table in [full_routes[g] for g in groups]:
+            if handler := table.get(path):
+                return handler, ()
 
+        # Walk every group's trie down the path together. The deepest match
+        # wins, with earlier (more specific) groups winning at equal depth.
         segments = tuple(seg for seg in path.split("/") if seg)
-
-        while True:
-            for group in groups:
-                if handler := self._prefix_routes[group].get(segments):
-                    return handler
-
-            if not segments:
-                raise ValueError
-            segments = segments[:-1]
+        nodes = [prefix_routes[g] for g in groups]
+        handler, depth = None, 0
+
+        for index in range(len(segments) + 1):
+            for node in nodes:
+                if node.route:
+                    handler, depth = node.route, index
+                    break
+
+            if index == len(segments):
+                break
+            segment = segments[index]
+            nodes = [child for node in nodes if (child := node.children.get(segment))]
+            if not nodes:
+                break
+
+        if not handler:
+            raise ValueError
+        return handler, segments[depth:]
 
 
 class RoutingView(Generic[AppCtx, RequestCtx, AppRoute]):
@@ -237,9 +278,6 @@ class BindConfig:
         self._binds = set()
         self._servers = {}
 
-    def __hash__(self) -> int:
-        return hash(self._binds)
-
     def add(self, bind: Bind) -> None:
         self._binds.add(bind)
 
@@ -274,6 +312,8 @@ class Application(Generic[AppCtx, RequestCtx, AppRoute]):
     _router: Router[AppCtx, RequestCtx, AppRoute]
     _config_lock: asyncio.Lock
 
+    __slots__ = ("_app_context", "_runner", "_binds", "_router", "_config_lock")
+
     def __init__(self, app_context: AppCtx, not_found_route: AppRoute) -> None:
         self._app_context = app_context
         self._binds = BindConfig(self._app_context.logger)
@@ -295,13 +335,17 @@ class Application(Generic[AppCtx, RequestCtx, AppRoute]):
         return self._router.route_table(bind, vhost)
 
     async def _handle(self, request: Request) -> ResponseProtocol:
-        route = self._router.route(pathlib.Path(), request.host, request.path)
+        route, request.path_args = self._router.route(_EMPTY_PATH, request.host, request.path)
         context = await self._app_context.make_context(route, request)
         try:
             async with context as request_context:
                 return await route.handler(request_context, request)
         except:  # noqa: E722 # pylint: disable=W0702 # we need to catch all errors here
-            return aiohttp.web.HTTPInternalServerError()
+            return aiohttp.web.Response(
+                status=500,
+                body=_SERVER_ERROR_BODY,
+                content_type="text/plain",
+            )
 
     async def __aenter__(self) -> Application[AppCtx, RequestCtx, AppRoute]:
         async with self._config_lock: